@@ -4,14 +4,19 @@
 支持传入多个 DataFrame 与策略名称。
 """
 from __future__ import annotations
+import os
+import operator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
 import backtrader as bt
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Tuple, List
 
 try:
-    from .strategy import STRATEGY_MAP, DEFAULT_STRATEGY_NAME
+    from .strategy import STRATEGY_MAP, DEFAULT_STRATEGY_NAME, BaseMultiDataStrategy
 except ImportError:
-    from strategy import STRATEGY_MAP, DEFAULT_STRATEGY_NAME  # type: ignore
+    from strategy import STRATEGY_MAP, DEFAULT_STRATEGY_NAME, BaseMultiDataStrategy  # type: ignore
 
 
 class PandasDataExt(bt.feeds.PandasData):
@@ -30,8 +35,8 @@ def run_backtest(dfs: List[pd.DataFrame], strategy_name: str | None = None, disp
     cerebro.broker.set_cash(100000.0)
 
     for i, df in enumerate(dfs):
-        data = df.copy()
-        data.set_index('date', inplace=True)
+        # 非 inplace 的 set_index 返回新对象，不改动调用方数据，无需先整表 copy
+        data = df.set_index('date')
         feed = PandasDataExt(dataname=data)  # type: ignore[arg-type]
         name = display_names[i] if display_names and i < len(display_names) else f'data{i}'
         cerebro.adddata(feed, name=name)
@@ -61,30 +66,39 @@ def run_backtest(dfs: List[pd.DataFrame], strategy_name: str | None = None, disp
 
     # 交易明细 DataFrame
     trade_records = getattr(strat, 'trade_records', [])
-    if trade_records:
+    if len(trade_records):
         trades_df = pd.DataFrame(trade_records)
+        # 结构化记录中日期为 datetime64；对外保持 date 对象 (GUI 按 date 匹配净值曲线上的买卖点)
+        for col in ('entry_date', 'exit_date'):
+            if pd.api.types.is_datetime64_any_dtype(trades_df[col]):
+                trades_df[col] = trades_df[col].dt.date
+        # 结构化记录把缺失的买入日期存为 NaT；对外还原为 None，与逐条 dict 记录时的 object 列一致
+        # (买入价列本就是 float64，缺失为 NaN，无需转换)
+        missing = trades_df['entry_date'].isna()
+        if missing.any():
+            trades_df['entry_date'] = trades_df['entry_date'].astype(object).where(~missing, None)
         trades_df.sort_values('exit_date', inplace=True)
     else:
         trades_df = pd.DataFrame(columns=['symbol','entry_date','exit_date','entry_price','exit_price','size','pnl_pct','holding_days'])
 
     returns_dict = strat.analyzers.timereturn.get_analysis()
-    equity_list = []
-    value = initial_cash
-    for dt, r in returns_dict.items():
-        value *= (1 + r)
-        equity_list.append({'date': dt, 'value': value})
-    equity_curve_df = pd.DataFrame(equity_list)
+    n_ret = len(returns_dict)
+    ret_dates = np.fromiter(returns_dict.keys(), dtype='datetime64[ns]', count=n_ret)
+    # 逐日 value *= (1 + r) 的顺序累乘 (itertools.accumulate 在 C 层循环)；np.cumprod 的累乘可能被向量化重排，
+    # 结果只在浮点舍入内一致，这里保持与逐日循环逐位相同
+    values = list(accumulate((1 + r for r in returns_dict.values()), operator.mul, initial=initial_cash))[1:]
+    equity_curve_df = pd.DataFrame({'date': ret_dates, 'value': values})
     if equity_curve_df.empty:
         equity_curve_df = pd.DataFrame({'date': ref_df['date'], 'value': initial_cash})
 
-    base = ref_df[['date', 'close']].copy()
-    base['benchmark'] = initial_cash * base['close'] / base['close'].iloc[0]
-    equity_curve_df = pd.merge(equity_curve_df, base[['date', 'benchmark']], on='date', how='right')
-    equity_curve_df['value'] = equity_curve_df['value'].ffill()
+    # 以基准标的交易日为轴对齐净值 (有序索引 reindex，无需 hash join)
+    base_close = ref_df['close'].to_numpy(dtype=float)
+    equity_curve_df = equity_curve_df.set_index('date').reindex(ref_df['date']).ffill().reset_index()
+    equity_curve_df['benchmark'] = initial_cash * base_close / base_close[0]
 
     # 合并持仓历史到 equity_curve
     pos_history = getattr(strat, 'pos_history', [])
-    if pos_history:
+    if len(pos_history):
         pos_df = pd.DataFrame(pos_history)
         pos_df['date'] = pd.to_datetime(pos_df['date'])
         equity_curve_df = equity_curve_df.merge(pos_df, on='date', how='left')
@@ -107,4 +121,60 @@ def run_backtest(dfs: List[pd.DataFrame], strategy_name: str | None = None, disp
         log_cb("回测完成。")
     return metrics, equity_curve_df, trades_df, strat
 
-__all__ = ['run_backtest']
+
+def _run_single(df: pd.DataFrame, strategy_name: str, name: str):
+    """子进程入口: 单标的独立回测。策略对象无法跨进程传递，只回传指标、净值、交易明细与盈利笔数。"""
+    metrics, equity_curve_df, trades_df, strat = run_backtest([df], strategy_name=strategy_name, display_names=[name])
+    return metrics, equity_curve_df, trades_df, getattr(strat, 'wins', 0)
+
+
+def run_parallel(dfs: List[pd.DataFrame], strategy_name: str | None = None, display_names: List[str] | None = None,
+                 n_workers: int | None = None, log_cb=None) -> Tuple[Dict[str, Any], pd.DataFrame, Dict[str, Tuple[Dict[str, Any], pd.DataFrame]]]:
+    """多进程并行执行逐标的独立回测，汇总交易次数、胜率与交易明细。
+
+    每个标的各用一个 cerebro 并独占全部初始资金，与 run_backtest 的组合回测 (共享资金、每标的 1/N 仓位)
+    语义不同，适合批量筛选标的。只支持逐标的独立产生信号的 BaseMultiDataStrategy 子类；
+    需要截面排序的策略 (如中规模轮动) 无法按标的拆分，抛出 ValueError。
+    返回 (汇总指标, 合并后的交易明细, {标的名称: (单标的指标, 单标的净值曲线)})；标的名称重复时抛出 ValueError。
+    """
+    # 未知策略名与 run_backtest 一样退回默认策略，汇总中报告实际使用的策略名
+    if strategy_name not in STRATEGY_MAP:
+        strategy_name = DEFAULT_STRATEGY_NAME
+    strategy_cls = STRATEGY_MAP[strategy_name]
+    if not issubclass(strategy_cls, BaseMultiDataStrategy):
+        raise ValueError(f"策略 {strategy_name} 依赖多标的截面计算，无法按标的拆分并行回测")
+    names = [display_names[i] if display_names and i < len(display_names) else f'data{i}' for i in range(len(dfs))]
+    if len(set(names)) != len(names):
+        dup = sorted({n for n in names if names.count(n) > 1})
+        raise ValueError(f"标的名称重复: {', '.join(dup)}；逐标的结果按名称返回，名称须唯一")
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(dfs)))
+    if log_cb:
+        log_cb(f"并行回测 {len(dfs)} 个标的 (进程数 {n_workers}) ...")
+    if n_workers == 1:
+        results = [_run_single(df, strategy_name, name) for df, name in zip(dfs, names)]
+    else:
+        # 每个标的一个任务: 结果与分块方式无关，由进程池自行均衡负载
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            results = list(ex.map(_run_single, dfs, [strategy_name] * len(dfs), names))
+
+    trades = sum(r[0]['交易次数'] for r in results)
+    wins = sum(r[3] for r in results)
+    trade_frames = [r[2] for r in results if not r[2].empty]
+    if trade_frames:
+        trades_df = pd.concat(trade_frames, ignore_index=True)
+        trades_df.sort_values('exit_date', inplace=True)
+    else:
+        trades_df = pd.DataFrame(columns=['symbol','entry_date','exit_date','entry_price','exit_price','size','pnl_pct','holding_days'])
+    summary = {
+        '交易次数': trades,
+        '胜率': wins / trades if trades > 0 else 0.0,
+        '策略': strategy_name,
+        '标的数量': len(dfs),
+    }
+    if log_cb:
+        log_cb("并行回测完成。")
+    return summary, trades_df, {name: (r[0], r[1]) for name, r in zip(names, results)}
+
+__all__ = ['run_backtest', 'run_parallel']
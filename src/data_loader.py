@@ -4,18 +4,56 @@
 负责通过 akshare 下载指定股票的前复权日线数据，并标准化字段。
 """
 from __future__ import annotations
+import os
+from datetime import date
 import akshare as ak
+import numpy as np
 import pandas as pd
 from typing import Callable
 
-# 映射：展示名称 -> akshare symbol（不含交易所后缀）
+try:
+    from numba import njit
+except ImportError:  # numba 为可选加速依赖，缺失时退化为纯 Python 实现
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+# 本地 Parquet 缓存目录 (项目根目录下 .cache/)，避免重复请求 akshare
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+
+
+def _cache_path(symbol: str, start_fmt: str, end_fmt: str, kind: str = 'qfq') -> str:
+    return os.path.join(CACHE_DIR, f"{symbol}_{start_fmt}_{end_fmt}_{kind}.parquet")
+
+
+def _read_cache(path: str) -> pd.DataFrame | None:
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path, engine='pyarrow')
+    except Exception:
+        return None
+
+
+def _write_cache(df: pd.DataFrame, path: str, end_fmt: str) -> None:
+    """写入缓存；截止日期未过去的数据 (当日可能未收盘) 不落盘。写入失败不影响主流程。"""
+    if end_fmt >= date.today().strftime('%Y%m%d'):
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_parquet(path, engine='pyarrow', index=False)
+    except Exception:
+        pass
+
+def _norm_name(name: str) -> str:
+    """统一全角/半角括号，便于名称查找。"""
+    return name.strip().replace('（', '(').replace('）', ')')
+
+# 映射：规范化展示名称 -> akshare symbol（不含交易所后缀），查找前先经 _norm_name
 DISPLAY_TO_SYMBOL = {
-    "金地集团（600383.SH)": "600383",
-    "金地集团（600383.SH)": "600383",  # 兼容可能的全角括号输入
-    "金地集团（600383.SH）": "600383",
-    "分众传媒（002027.SZ)": "002027",
-    "分众传媒（002027.SZ)": "002027",
-    "分众传媒（002027.SZ）": "002027",
+    "金地集团(600383.SH)": "600383",
+    "分众传媒(002027.SZ)": "002027",
 }
 # 规范化 GUI 下拉项（用于回测内部处理）
 NORMALIZED_OPTIONS = [
@@ -40,7 +78,7 @@ def get_stock_data(display_name: str, start: str, end: str, log_cb: Callable[[st
     try:
         if log_cb:
             log_cb(f"正在获取数据: {display_name} ({start} ~ {end}) 前复权日线 ...")
-        symbol_raw = DISPLAY_TO_SYMBOL.get(display_name, None)
+        symbol_raw = DISPLAY_TO_SYMBOL.get(_norm_name(display_name))
         if not symbol_raw:
             raise RuntimeError(f"无法识别的股票名称: {display_name}")
 
@@ -48,6 +86,13 @@ def get_stock_data(display_name: str, start: str, end: str, log_cb: Callable[[st
         start_fmt = start.replace('-', '')
         end_fmt = end.replace('-', '')
 
+        cache_path = _cache_path(symbol_raw, start_fmt, end_fmt)
+        cached = _read_cache(cache_path)
+        if cached is not None:
+            if log_cb:
+                log_cb(f"命中本地缓存，共 {len(cached)} 行。")
+            return cached
+
         # 调用 akshare 接口
         df = ak.stock_zh_a_hist(symbol=symbol_raw, period="daily", start_date=start_fmt, end_date=end_fmt, adjust="qfq")
         if df is None or df.empty:
@@ -64,18 +109,18 @@ def get_stock_data(display_name: str, start: str, end: str, log_cb: Callable[[st
             '成交额': 'amount',
         })
         # 处理类型与顺序
-        df['date'] = pd.to_datetime(df['date'])
+        df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d', cache=True)
         df = df[['date', 'open', 'high', 'low', 'close', 'volume', 'amount']].sort_values('date').reset_index(drop=True)
 
-        # 缺失值处理
-        missing = df.isna().sum().sum()
-        if missing > 0:
+        # 缺失值处理：逐列 hasnans 短路判断，仅在确有缺失时才统计数量
+        if any(df[c].hasnans for c in df.columns):
             if log_cb:
-                log_cb(f"发现 {missing} 个缺失值，已用前向填充处理")
+                log_cb(f"发现 {int(df.isna().sum().sum())} 个缺失值，已用前向填充处理")
             # 使用 ffill 填充缺失值，兼容类型检查
             df.ffill(inplace=True)
             df.fillna(0, inplace=True)
 
+        _write_cache(df, cache_path, end_fmt)
         if log_cb:
             log_cb(f"数据获取成功，共 {len(df)} 行。")
         return df
@@ -83,13 +128,50 @@ def get_stock_data(display_name: str, start: str, end: str, log_cb: Callable[[st
         raise RuntimeError(f"数据获取失败: {e}") from e
 
 
+# 注: 不使用 cache=True —— numba 磁盘缓存按文件定位、却按模块名重建，本模块会以 src.data_loader
+# (python -m src.main) 与 data_loader (python src/main.py) 两种名字导入，交替启动时读取缓存会抛
+# ModuleNotFoundError。编译只在每个进程首次计算 MACD 时发生一次。
+@njit
+def _ewm_step(value, old_wt, x, alpha):
+    """EMA 单步递推，与 pandas ewm(adjust=False, ignore_na=False) 逐位一致。"""
+    if value == value:
+        old_wt *= 1.0 - alpha
+        if x == x:
+            if value != x:
+                value = (old_wt * value + alpha * x) / (old_wt + alpha)
+            old_wt = 1.0
+    elif x == x:
+        value = x
+    return value, old_wt
+
+
+@njit
+def _macd_kernel(close, fast, slow, signal):
+    """单次扫描 close，同时输出 DIF / DEA / MACD 柱。"""
+    n = close.shape[0]
+    dif = np.empty(n)
+    dea = np.empty(n)
+    hist = np.empty(n)
+    a_fast = 2.0 / (fast + 1.0)
+    a_slow = 2.0 / (slow + 1.0)
+    a_sig = 2.0 / (signal + 1.0)
+    ema_fast = ema_slow = ema_sig = np.nan
+    wt_fast = wt_slow = wt_sig = 1.0
+    for i in range(n):
+        x = close[i]
+        ema_fast, wt_fast = _ewm_step(ema_fast, wt_fast, x, a_fast)
+        ema_slow, wt_slow = _ewm_step(ema_slow, wt_slow, x, a_slow)
+        d = ema_fast - ema_slow
+        ema_sig, wt_sig = _ewm_step(ema_sig, wt_sig, d, a_sig)
+        dif[i] = d
+        dea[i] = ema_sig
+        hist[i] = d - ema_sig
+    return dif, dea, hist
+
+
 def compute_macd(df: pd.DataFrame) -> pd.DataFrame:
     """计算 MACD 指标列并添加到 DataFrame (DIF, DEA, MACD_HIST)。"""
-    fast_ema = df['close'].ewm(span=12, adjust=False).mean()
-    slow_ema = df['close'].ewm(span=26, adjust=False).mean()
-    dif = fast_ema - slow_ema
-    dea = dif.ewm(span=9, adjust=False).mean()
-    hist = dif - dea
+    dif, dea, hist = _macd_kernel(df['close'].to_numpy(dtype=np.float64), 12, 26, 9)
     df['DIF'] = dif
     df['DEA'] = dea
     df['MACD_HIST'] = hist
@@ -118,6 +200,10 @@ def get_generic_hist(symbol: str, start: str, end: str) -> pd.DataFrame:
     s_clean = re.sub(r"\.SH$|\.SZ$", "", s_clean)
     start_fmt = start.replace('-', '')
     end_fmt = end.replace('-', '')
+    cache_path = _cache_path(s_clean, start_fmt, end_fmt, kind='generic')
+    cached = _read_cache(cache_path)
+    if cached is not None:
+        return cached
     df = None
     # 尝试 ETF
     try:
@@ -136,6 +222,7 @@ def get_generic_hist(symbol: str, start: str, end: str) -> pd.DataFrame:
             df = None
     if df is None or df.empty:
         raise RuntimeError(f"无法获取数据: {symbol}")
-    df['date'] = pd.to_datetime(df['date'])
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d', cache=True)
     df = df[['date', 'open', 'high', 'low', 'close', 'volume', 'amount']].sort_values('date').reset_index(drop=True)
+    _write_cache(df, cache_path, end_fmt)
     return df
@@ -11,11 +11,16 @@ from __future__ import annotations
 from PyQt6.QtWidgets import (
     QWidget, QMainWindow, QApplication, QVBoxLayout, QHBoxLayout,
     QComboBox, QDateEdit, QPushButton, QTabWidget, QTextEdit, QTableWidget,
-    QTableWidgetItem, QLabel, QListWidget, QListWidgetItem
+    QTableWidgetItem, QTableView, QLabel, QListWidget
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QDate
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QDate, QAbstractTableModel, QModelIndex, QSignalBlocker
 from PyQt6.QtGui import QIcon, QColor, QKeySequence, QShortcut
 import traceback
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+import numpy as np
 import pandas as pd
 import matplotlib
 from matplotlib.figure import Figure
@@ -24,23 +29,48 @@ try:
     from matplotlib.backends.backend_qt import NavigationToolbar2QT as NavigationToolbar
 except Exception:  # fallback for backend differences
     NavigationToolbar = None
-from matplotlib import patches
-import mplcursors
+from matplotlib.collections import LineCollection, PolyCollection
+import matplotlib.dates as mdates
 
 # 全局字体设置：尝试使用系统可用中文字体，解决中文显示乱码问题
 try:
     from matplotlib import font_manager as _fm
     _candidates = ["PingFang SC", "Songti SC", "Heiti SC", "SimHei", "Microsoft YaHei", "WenQuanYi Micro Hei"]
-    _available = {f.name for f in _fm.fontManager.ttflist}
-    for _fname in _candidates:
-        if _fname in _available:
-            matplotlib.rcParams['font.family'] = _fname
-            break
+    # 扫描结果缓存在 matplotlib 模块上（未找到记为空串），模块被重复导入/重载时不再遍历字体列表
+    _chosen = getattr(matplotlib, '_chosen_cn_font', None)
+    if _chosen is None:
+        _available = {f.name for f in _fm.fontManager.ttflist}
+        _chosen = next((_fname for _fname in _candidates if _fname in _available), '')
+        matplotlib._chosen_cn_font = _chosen
+    if _chosen:
+        matplotlib.rcParams['font.family'] = _chosen
     # 避免负号显示成乱码或方块
     matplotlib.rcParams['axes.unicode_minus'] = False
 except Exception:
     pass
 
+
+def _f32(s: pd.Series) -> np.ndarray:
+    """取列为 float32 数组，供绘图使用。"""
+    return s.to_numpy(dtype=np.float32)
+
+
+def _rect_verts(xs: np.ndarray, bottom: np.ndarray, top: np.ndarray, width: float) -> np.ndarray:
+    """批量生成以 xs 为中心的矩形顶点，形状 (N, 4, 2)，供 PolyCollection 使用。"""
+    left, right = xs - width / 2, xs + width / 2
+    return np.stack([np.column_stack([left, bottom]), np.column_stack([right, bottom]),
+                     np.column_stack([right, top]), np.column_stack([left, top])], axis=1)
+
+
+def _nearest_index(xs: np.ndarray, x: float) -> int:
+    """在升序数组 xs 中二分查找与 x 最接近的下标。"""
+    i = int(np.searchsorted(xs, x))
+    if i >= len(xs):
+        return len(xs) - 1
+    if i > 0 and x - xs[i - 1] < xs[i] - x:
+        return i - 1
+    return i
+
 # 兼容包/脚本双运行模式的导入
 try:
     from .data_loader import get_stock_data, compute_macd, NORMALIZED_OPTIONS
@@ -51,6 +81,32 @@ except ImportError:
     from backtest import run_backtest  # type: ignore
     from strategy import STRATEGY_MAP, DEFAULT_STRATEGY_NAME  # type: ignore
 
+# 进程内 LRU：(标的, 开始, 结束) -> 已计算 MACD 的行情，重复回测同一区间时跳过读盘/联网
+_DATA_CACHE: OrderedDict[tuple[str, str, str], pd.DataFrame] = OrderedDict()
+_DATA_CACHE_SIZE = 32
+_DATA_CACHE_LOCK = threading.Lock()
+
+
+def _load_symbol(name: str, start: str, end: str, log_cb=None) -> pd.DataFrame:
+    """取数并计算 MACD，结果进入内存 LRU；结束日期含今天的区间数据仍可能变化，不缓存。"""
+    key = (name, start, end)
+    with _DATA_CACHE_LOCK:
+        df = _DATA_CACHE.get(key)
+        if df is not None:
+            _DATA_CACHE.move_to_end(key)
+    if df is not None:
+        if log_cb:
+            log_cb(f"命中内存缓存: {name}，共 {len(df)} 行。")
+        return df
+    df = compute_macd(get_stock_data(name, start, end, log_cb=log_cb))
+    if pd.Timestamp(end).date() < date.today():
+        with _DATA_CACHE_LOCK:
+            _DATA_CACHE[key] = df
+            _DATA_CACHE.move_to_end(key)
+            while len(_DATA_CACHE) > _DATA_CACHE_SIZE:
+                _DATA_CACHE.popitem(last=False)
+    return df
+
 class BacktestWorker(QThread):
     progress = pyqtSignal(int, str)
     finished = pyqtSignal(dict, pd.DataFrame, pd.DataFrame, list)  # metrics, equity_curve, trades, list_of_ohlc_dfs
@@ -67,23 +123,79 @@ class BacktestWorker(QThread):
         try:
             self.progress.emit(5, "线程启动")
             self.progress.emit(10, "开始获取数据 ...")
-            dfs = []
-            for name in self.display_names:
-                self.progress.emit(10, f"获取数据 {name} ...")
-                df = get_stock_data(name, self.start_date_str, self.end_date_str, log_cb=lambda m: self.progress.emit(15, m))
-                df = compute_macd(df)
-                dfs.append(df)
+            # 各标的取数以网络 IO 为主，线程池并发拉取，结果按选择顺序重排
+            results = {}
+            with ThreadPoolExecutor(max_workers=min(8, max(len(self.display_names), 1))) as ex:
+                futures = {}
+                for name in self.display_names:
+                    self.progress.emit(10, f"获取数据 {name} ...")
+                    futures[ex.submit(_load_symbol, name, self.start_date_str, self.end_date_str,
+                                      log_cb=lambda m: self.progress.emit(15, m))] = name
+                for fut in as_completed(futures):
+                    results[futures[fut]] = fut.result()
+            dfs = [results[name] for name in self.display_names]
             self.progress.emit(40, "执行回测 ...")
             metrics, equity_curve_df, trades_df, strat = run_backtest(dfs, strategy_name=self.strategy_name, display_names=self.display_names, log_cb=lambda m: self.progress.emit(70, m))
             self.progress.emit(90, "准备图表数据 ...")
-            # 保留所有 ohlc dfs，UI 可选择主图标的
-            ohlc_list = [d.copy() for d in dfs]
+            # 保留所有 ohlc dfs，UI 可选择主图标的；回测结束后不再修改，界面只读，直接传引用
             self.progress.emit(100, "完成")
-            self.finished.emit(metrics, equity_curve_df, trades_df, ohlc_list)
+            self.finished.emit(metrics, equity_curve_df, trades_df, dfs)
         except Exception as e:
             err = f"回测线程异常: {e}\n{traceback.format_exc()}"
             self.error.emit(err)
 
+class TradesTableModel(QAbstractTableModel):
+    """交易明细表模型 (虚拟表)
+    刷新时按列一次性格式化为字符串数组，视图只为可见单元格调用 data() 取值，
+    一次 reset 代替逐行 insertRow/setItem。
+    """
+    HEADERS = ['标的', '买入日期', '卖出日期', '买入价', '卖出价', '数量', '收益率(%)', '持仓天数']
+    COLUMNS = ['symbol', 'entry_date', 'exit_date', 'entry_price', 'exit_price', 'size', 'pnl_pct', 'holding_days']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cols: list[np.ndarray] = []
+        self._rows = 0
+
+    def set_trades(self, trades_df: pd.DataFrame | None):
+        self.beginResetModel()
+        if trades_df is None or trades_df.empty:
+            self._cols, self._rows = [], 0
+        else:
+            n = len(trades_df)
+            self._cols = [self._format_column(trades_df[c]) if c in trades_df.columns else np.full(n, '')
+                          for c in self.COLUMNS]
+            self._rows = n
+        self.endResetModel()
+
+    @staticmethod
+    def _format_column(col: pd.Series) -> np.ndarray:
+        """整列向量化格式化：价格两位小数 (空/0 不显示)，收益率转百分比，其余 str。"""
+        if col.name in ('entry_price', 'exit_price'):
+            num = pd.to_numeric(col, errors='coerce').to_numpy(dtype=float)
+            return np.where(col.notna().to_numpy() & (num != 0), np.char.mod('%.2f', num), '')
+        if col.name == 'pnl_pct':
+            num = pd.to_numeric(col, errors='coerce').to_numpy(dtype=float)
+            return np.where(col.isna().to_numpy(), '', np.char.mod('%.2f', num * 100))
+        return col.to_numpy().astype(str)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return str(self._cols[index.column()][index.row()])
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -101,12 +213,7 @@ class MainWindow(QMainWindow):
         top_bar = QHBoxLayout()
         self.stock_list = QListWidget()
         self.stock_list.setSelectionMode(QListWidget.SelectionMode.MultiSelection)
-        for opt in NORMALIZED_OPTIONS:
-            self.stock_list.addItem(QListWidgetItem(opt))
-        for i in range(self.stock_list.count()):
-            item = self.stock_list.item(i)
-            if item is not None:
-                item.setSelected(True)
+        self._populate_stock_list(NORMALIZED_OPTIONS)
 
         # 主图标的选择（回测完成后填充）
         self.primary_label = QLabel("主图:")
@@ -115,8 +222,7 @@ class MainWindow(QMainWindow):
         self.primary_combo.currentIndexChanged.connect(self.on_primary_changed)
 
         self.strategy_combo = QComboBox()
-        for name in STRATEGY_MAP.keys():
-            self.strategy_combo.addItem(name)
+        self.strategy_combo.addItems(list(STRATEGY_MAP.keys()))
         self.strategy_combo.setCurrentText(DEFAULT_STRATEGY_NAME)
 
         self.start_date = QDateEdit()
@@ -169,24 +275,30 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(self.tabs, stretch=1)
 
         chart_layout = QVBoxLayout(self.chart_tab)
-        self.fig = Figure(figsize=(8, 5))
+        self.fig = Figure(figsize=(8, 5), layout='tight')
         self.canvas = FigureCanvas(self.fig)
         chart_layout.addWidget(self.canvas)
         # 添加 Matplotlib 工具栏，支持放大/缩小/平移/保存
+        self.chart_toolbar = None
         try:
             if NavigationToolbar is not None:
-                toolbar = NavigationToolbar(self.canvas, self)
-                chart_layout.addWidget(toolbar)
+                self.chart_toolbar = NavigationToolbar(self.canvas, self)
+                chart_layout.addWidget(self.chart_toolbar)
         except Exception:
             pass
+        self._init_chart_axes()
+        self.canvas.mpl_connect('scroll_event', self._on_chart_scroll)
+        self.canvas.mpl_connect('motion_notify_event', self._on_chart_hover)
 
         # 收益曲线 + 指标在同一 Tab
         equity_layout = QHBoxLayout(self.equity_tab)
         # 左侧：收益曲线
         left_box = QVBoxLayout()
-        self.equity_fig = Figure(figsize=(8,5))
+        self.equity_fig = Figure(figsize=(8,5), layout='tight')
         self.equity_canvas = FigureCanvas(self.equity_fig)
         left_box.addWidget(self.equity_canvas)
+        self._init_equity_axes()
+        self.equity_canvas.mpl_connect('motion_notify_event', self._on_equity_hover)
         equity_layout.addLayout(left_box, stretch=4)
         # 右侧：指标表
         right_box = QVBoxLayout()
@@ -202,10 +314,11 @@ class MainWindow(QMainWindow):
         equity_layout.addWidget(side, stretch=0)
 
         trades_layout = QVBoxLayout(self.trades_tab)
-        self.trades_table = QTableWidget(0, 8)
-        self.trades_table.setHorizontalHeaderLabels(['标的','买入日期','卖出日期','买入价','卖出价','数量','收益率(%)','持仓天数'])
-        self.trades_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.trades_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.trades_model = TradesTableModel(self)
+        self.trades_table = QTableView()
+        self.trades_table.setModel(self.trades_model)
+        self.trades_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.trades_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         trades_layout.addWidget(self.trades_table)
 
         self.log_text = QTextEdit()
@@ -252,14 +365,14 @@ class MainWindow(QMainWindow):
         # ohlc_list is aligned with display_names order
         names = getattr(self.worker, 'display_names', [])
         self.ohlc_map = {name: df for name, df in zip(names, ohlc_list)}
-        # enable primary selector and populate
-        self.primary_combo.clear()
-        for name in names:
-            self.primary_combo.addItem(name)
+        # enable primary selector and populate；填充期间屏蔽信号，避免用旧交易数据提前绘制，主图统一在下方绘制一次
+        with QSignalBlocker(self.primary_combo):
+            self.primary_combo.clear()
+            self.primary_combo.addItems(list(names))
+            self.primary_combo.setCurrentIndex(0)
         self.primary_combo.setEnabled(True)
-        self.primary_combo.setCurrentIndex(0)
         # store trades for hover matching
-        self.last_trades_df = trades_df.copy() if trades_df is not None else pd.DataFrame()
+        self.last_trades_df = trades_df if trades_df is not None else pd.DataFrame()
         # draw initial chart using first symbol
         primary_df = ohlc_list[0] if ohlc_list else pd.DataFrame()
         self.update_charts(primary_df, trades_df)
@@ -306,24 +419,27 @@ class MainWindow(QMainWindow):
             if not new_map:
                 self.log("策略映射为空或不存在。")
                 return
-            current = self.strategy_combo.currentText()
-            self.strategy_combo.clear()
-            for name in new_map.keys():
-                self.strategy_combo.addItem(name)
-            # 尝试保持原选择
-            if current in new_map:
-                self.strategy_combo.setCurrentText(current)
-            elif default_name:
-                self.strategy_combo.setCurrentText(default_name)
+            self._populate_strategy_combo(new_map, default_name)
             self.log(f"策略刷新完成，共 {len(new_map)} 条。")
         except Exception as e:
             self.log(f"刷新策略内部出错: {e}")
 
+    def _populate_strategy_combo(self, strategy_map: dict, default_name: str | None):
+        """按策略映射重填下拉框，尽量保持原选择。"""
+        current = self.strategy_combo.currentText()
+        self.strategy_combo.clear()
+        self.strategy_combo.addItems(list(strategy_map.keys()))
+        # 尝试保持原选择
+        if current in strategy_map:
+            self.strategy_combo.setCurrentText(current)
+        elif default_name:
+            self.strategy_combo.setCurrentText(default_name)
+
     def update_table(self, metrics: dict):
-        self.table.setRowCount(0)
-        for k, v in metrics.items():
-            row = self.table.rowCount()
-            self.table.insertRow(row)
+        # 先一次性设定行数并暂停重绘，填完再统一刷新与调整列宽
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(metrics))
+        for row, (k, v) in enumerate(metrics.items()):
             unit = "%" if "率" in k or "回撤" in k else ("元" if "资产" in k else "")
             self.table.setItem(row, 0, QTableWidgetItem(k))
             if isinstance(v, float):
@@ -335,83 +451,141 @@ class MainWindow(QMainWindow):
                 show_v = str(v)
             self.table.setItem(row, 1, QTableWidgetItem(show_v))
             self.table.setItem(row, 2, QTableWidgetItem(unit))
+        self.table.setUpdatesEnabled(True)
         self.table.resizeColumnsToContents()
 
-    def update_charts(self, ohlc_df: pd.DataFrame, trades_df: pd.DataFrame):
-        """绘制 K 线，标注买卖点；中间展示 MACD 柱状图；底部展示 Vol 柱。支持滚轮缩放；悬停显示中文 OHLC。"""
-        self.fig.clear()
+    def _populate_stock_list(self, options):
+        """填充标的列表并默认全选；填充期间屏蔽信号并暂停重绘，避免逐项触发模型信号与刷新。"""
+        self.stock_list.setUpdatesEnabled(False)
+        with QSignalBlocker(self.stock_list):
+            self.stock_list.clear()
+            self.stock_list.addItems(list(options))
+            self.stock_list.selectAll()
+        self.stock_list.setUpdatesEnabled(True)
+
+    def _init_equity_axes(self):
+        """收益曲线坐标轴与净值曲线只创建一次，后续回测仅替换数据。"""
+        self.equity_ax = self.equity_fig.add_subplot(1,1,1)
+        self.equity_ax.set_title("策略收益曲线")
+        self.equity_ax.grid(alpha=0.3)
+        self.equity_ax.xaxis_date()
+        self.equity_line, = self.equity_ax.plot([], [], label='净值', color='orange')
+        # 悬停：单个注释对象 + 鼠标移动事件，按 x 二分查找最近点 (不依赖 mplcursors 的拾取)
+        self._equity_xnums = np.empty(0)
+        self._equity_values = np.empty(0)
+        self._equity_labels: list[str] = []
+        self._equity_hover_idx = -1
+        self._equity_annot = self.equity_ax.annotate(
+            '', xy=(0, 0), xytext=(15, 15), textcoords='offset points',
+            bbox=dict(boxstyle='round', fc='#ffffe0', alpha=0.9), arrowprops=dict(arrowstyle='->'))
+        self._equity_annot.set_visible(False)
+
+    def _init_chart_axes(self):
+        """K 线三联图的坐标轴与 artist 只创建一次，之后 update_charts 仅替换数据。"""
         gs = self.fig.add_gridspec(3, 1, height_ratios=[3, 1, 1], hspace=0.06)
-        ax_price = self.fig.add_subplot(gs[0])
-        ax_macd = self.fig.add_subplot(gs[1], sharex=ax_price)  # 中间：MACD 柱
-        ax_vol = self.fig.add_subplot(gs[2], sharex=ax_price)   # 底部：Vol 柱
-
+        self.ax_price = self.fig.add_subplot(gs[0])
+        self.ax_macd = self.fig.add_subplot(gs[1], sharex=self.ax_price)  # 中间：MACD 柱
+        self.ax_vol = self.fig.add_subplot(gs[2], sharex=self.ax_price)   # 底部：Vol 柱
         # 左上角显示主图股票名称与编码（当前选择）
+        self._chart_title = self.ax_price.text(0.01, 0.98, '', transform=self.ax_price.transAxes,
+                                               ha='left', va='top', fontsize=12, color='#333', fontweight='bold')
+        self._wick_lc = LineCollection([], linewidths=1)
+        self._body_pc = PolyCollection([], alpha=0.6)
+        self.ax_price.add_collection(self._wick_lc)
+        self.ax_price.add_collection(self._body_pc)
+        self._buy_sc = self.ax_price.scatter([], [], marker='^', color='#2ca02c', s=50, zorder=5)
+        self._sell_sc = self.ax_price.scatter([], [], marker='v', color='#d64f4f', s=50, zorder=5)
+        self.ax_price.tick_params(axis='x', labelbottom=False)
+        self._macd_pc = PolyCollection([], alpha=0.8, linewidths=0)
+        self._vol_pc = PolyCollection([], alpha=0.8, linewidths=0)
+        for ax, pc, label in ((self.ax_macd, self._macd_pc, 'MACD'), (self.ax_vol, self._vol_pc, 'Vol')):
+            pc.sticky_edges.y.append(0)  # 与 ax.bar 一致：柱体以 0 为基线，不额外留白
+            ax.add_collection(pc)
+            ax.set_ylabel(label)
+        self.ax_macd.axhline(0, color='#888', linewidth=0.8)
+        self._last_chart_src = None  # 最近一次绘制的 (行情, 交易) 对象，相同则跳过重绘
+        # 悬停：x 即 K 线下标，鼠标移动时直接取整定位，单个注释对象复用
+        self._chart_close = np.empty(0)
+        self._chart_hover_texts: list[str] = []
+        self._chart_hover_idx = -1
+        self._chart_annot = self.ax_price.annotate(
+            '', xy=(0, 0), xytext=(15, 15), textcoords='offset points',
+            bbox=dict(boxstyle='round', fc='#ffffe0', alpha=0.9), arrowprops=dict(arrowstyle='->'))
+        self._chart_annot.set_visible(False)
+
+    def update_charts(self, ohlc_df: pd.DataFrame, trades_df: pd.DataFrame):
+        """绘制 K 线，标注买卖点；中间展示 MACD 柱状图；底部展示 Vol 柱。支持滚轮缩放；悬停显示中文 OHLC。"""
+        # 行情与交易对象都未变（如回测完成后程序化切换下拉框）时无需重绘；比较对象本身，避免 id 复用误判
+        src = self._last_chart_src
+        if src is not None and src[0] is ohlc_df and src[1] is trades_df:
+            return
+        self._last_chart_src = (ohlc_df, trades_df)
+        ax_price, ax_macd, ax_vol = self.ax_price, self.ax_macd, self.ax_vol
         primary_combo = getattr(self, 'primary_combo', None)
         first_name = primary_combo.currentText() if primary_combo is not None else '主图'
-        ax_price.set_title("")
-        ax_price.text(0.01, 0.98, first_name, transform=ax_price.transAxes,
-                      ha='left', va='top', fontsize=12, color='#333', fontweight='bold')
-        # 绘制蜡烛
+        self._chart_title.set_text(first_name)
+
+        # 蜡烛：影线与实体各为一个集合对象，只替换顶点与颜色
         width = 0.6
-        for pos, (idx, row) in enumerate(ohlc_df.iterrows()):
-            o = float(row['open']); c = float(row['close']); h = float(row['high']); l = float(row['low'])
-            color = 'red' if c >= o else 'green'
-            ax_price.plot([pos, pos], [l, h], color=color, linewidth=1)
-            ax_price.add_patch(patches.Rectangle((pos - width/2, min(o, c)), width,
-                                                 abs(c - o), color=color, alpha=0.6))
-        ax_price.set_xlim(-1, len(ohlc_df))
-        ax_price.tick_params(axis='x', labelbottom=False)
+        # 绘图数组统一 float32：屏幕精度远低于单精度，减半顶点数据量
+        o, h, l, c = (_f32(ohlc_df[col]) for col in ('open', 'high', 'low', 'close'))
+        xs = np.arange(len(ohlc_df), dtype=np.float32)
+        up_mask = c >= o  # 阳线掩码，蜡烛与 Vol 柱共用
+        candle_colors = np.where(up_mask, 'red', 'green')
+        self._wick_lc.set_segments(np.stack([np.column_stack([xs, l]), np.column_stack([xs, h])], axis=1))
+        self._wick_lc.set_colors(candle_colors)
+        self._body_pc.set_verts(_rect_verts(xs, np.minimum(o, c), np.maximum(o, c), width))
+        self._body_pc.set_facecolors(candle_colors)
+        self._body_pc.set_edgecolors(candle_colors)
 
         # 买卖点标注（当前主图标的）并构建统一悬浮信息（交易摘要），避免多个浮窗
         trade_map = {}
+        buy_x, buy_y, sell_x, sell_y = [], [], [], []
         try:
             if first_name and not trades_df.empty and 'symbol' in trades_df.columns:
-                pos_map = {pd.Timestamp(d): i for i, d in enumerate(ohlc_df['date'])}
-                sub = trades_df[trades_df['symbol'] == first_name].copy()
-                buy_x, buy_y = [], []
-                sell_x, sell_y = [], []
-                for _, t in sub.iterrows():
-                    entry_raw = t.get('entry_date', None)
-                    exit_raw = t.get('exit_date', None)
-                    entry_date = pd.Timestamp(entry_raw) if (entry_raw is not None and pd.notna(entry_raw)) else None
-                    exit_date = pd.Timestamp(exit_raw) if (exit_raw is not None and pd.notna(exit_raw)) else None
-                    size = t.get('size', '')
-                    if entry_date is not None and entry_date in pos_map:
-                        i_buy = pos_map[entry_date]
-                        buy_x.append(i_buy)
-                        buy_y.append(float(ohlc_df['close'].iloc[i_buy]))
-                        ep = t.get('entry_price', None)
-                        rec = f"买入 价:{ep:.2f} 数量:{size}" if ep is not None else f"买入 数量:{size}"
-                        trade_map.setdefault(entry_date.date(), []).append(rec)
-                    if exit_date is not None and exit_date in pos_map:
-                        i_sell = pos_map[exit_date]
-                        sell_x.append(i_sell)
-                        sell_y.append(float(ohlc_df['close'].iloc[i_sell]))
-                        xp = t.get('exit_price', None)
-                        pnl = t.get('pnl_pct', None)
-                        pnl_txt = f" 收益:{pnl*100:.2f}%" if pnl is not None else ""
-                        rec2 = f"卖出 价:{xp:.2f}{pnl_txt}" if xp is not None else f"卖出{pnl_txt}"
-                        trade_map.setdefault(exit_date.date(), []).append(rec2)
-                if buy_x:
-                    ax_price.scatter(buy_x, buy_y, marker='^', color='#2ca02c', s=50, zorder=5)
-                if sell_x:
-                    ax_price.scatter(sell_x, sell_y, marker='v', color='#d64f4f', s=50, zorder=5)
+                date_idx = pd.DatetimeIndex(ohlc_df['date'])
+                sub = trades_df[trades_df['symbol'] == first_name]
+                # 一次性把买卖日期映射为 K 线下标，找不到（含未平仓的 NaT）为 -1
+                entry_pos = date_idx.get_indexer(pd.to_datetime(sub['entry_date'], errors='coerce'))
+                exit_pos = date_idx.get_indexer(pd.to_datetime(sub['exit_date'], errors='coerce'))
+                buy_x, sell_x = entry_pos[entry_pos >= 0], exit_pos[exit_pos >= 0]
+                buy_y, sell_y = c[buy_x], c[sell_x]
+                # 按列 zip 取值，缺失列用默认值补齐，不再逐行构造 Series
+                cols = [sub[k] if k in sub.columns else [dflt] * len(sub)
+                        for k, dflt in (('size', ''), ('entry_price', None), ('exit_price', None), ('pnl_pct', None))]
+                for i_buy, i_sell, size, ep, xp, pnl in zip(entry_pos, exit_pos, *cols):
+                    if i_buy >= 0:
+                        rec = f"买入 价:{ep:.2f} 数量:{size}" if pd.notna(ep) else f"买入 数量:{size}"
+                        trade_map.setdefault(date_idx[i_buy].date(), []).append(rec)
+                    if i_sell >= 0:
+                        pnl_txt = f" 收益:{pnl*100:.2f}%" if pd.notna(pnl) else ""
+                        rec2 = f"卖出 价:{xp:.2f}{pnl_txt}" if pd.notna(xp) else f"卖出{pnl_txt}"
+                        trade_map.setdefault(date_idx[i_sell].date(), []).append(rec2)
         except Exception:
-            pass
+            buy_x, buy_y, sell_x, sell_y = [], [], [], []
+        self._buy_sc.set_offsets(np.column_stack([buy_x, buy_y]))
+        self._sell_sc.set_offsets(np.column_stack([sell_x, sell_y]))
+        # relim 会统计集合对象的当前数据，须在蜡烛与买卖点都替换后调用；旧版 matplotlib 的 relim 不统计集合，影线上下端再显式并入
+        ax_price.relim()
+        ax_price.update_datalim(np.column_stack([np.concatenate([xs, xs]), np.concatenate([l, h])]))
+        ax_price.autoscale_view()
+        ax_price.set_xlim(-1, len(ohlc_df))
 
         # MACD 柱状图 (中间)
         hist = ohlc_df['MACD_HIST'] if 'MACD_HIST' in ohlc_df.columns else (ohlc_df['DIF'] - ohlc_df['DEA'])
-        x = range(len(ohlc_df))
-        colors = ['#d64f4f' if v >= 0 else '#2ca02c' for v in hist]
-        ax_macd.bar(x, hist, color=colors, width=0.8, alpha=0.8)
-        ax_macd.axhline(0, color='#888', linewidth=0.8)
-        ax_macd.set_ylabel('MACD')
+        hist = _f32(hist)
+        zeros = np.zeros(len(ohlc_df), dtype=np.float32)
+        self._macd_pc.set_verts(_rect_verts(xs, zeros, hist, 0.8))
+        self._macd_pc.set_facecolors(np.where(hist >= 0, '#d64f4f', '#2ca02c'))
 
         # Vol 柱状图 (底部)
-        vol = ohlc_df['volume']
-        up_colors = ['#d64f4f' if (ohlc_df['close'].iloc[i] >= ohlc_df['open'].iloc[i]) else '#2ca02c' for i in range(len(ohlc_df))]
-        ax_vol.bar(range(len(ohlc_df)), vol, color=up_colors, width=0.8, alpha=0.8)
-        ax_vol.set_ylabel('Vol')
+        vol = _f32(ohlc_df['volume'])
+        self._vol_pc.set_verts(_rect_verts(xs, zeros, vol, 0.8))
+        self._vol_pc.set_facecolors(np.where(up_mask, '#d64f4f', '#2ca02c'))
+        for ax, ys in ((ax_macd, hist), (ax_vol, vol)):
+            ax.relim()
+            ax.update_datalim(np.column_stack([np.concatenate([xs, xs]), np.concatenate([zeros, ys])]))
+            ax.autoscale_view(scalex=False)
 
         # X 轴日期（在最底部显示）
         step = max(len(ohlc_df)//20, 1)
@@ -419,161 +593,137 @@ class MainWindow(QMainWindow):
         ax_vol.set_xticks(range(0, len(ohlc_df), step))
         ax_vol.set_xticklabels([show_dates[i] for i in range(0, len(ohlc_df), step)], rotation=45, fontsize=8)
 
-        # Hover：单一浮窗（日期+OHLC+当日交易摘要），不再为买卖点单独弹窗
-        try:
-            import numpy as np
-            x_idx = np.arange(len(ohlc_df))
-            y_close = ohlc_df['close'].to_numpy()
-            line_close, = ax_price.plot(x_idx, y_close, alpha=0)
-            cursor = mplcursors.cursor([line_close], hover=True)
-            @cursor.connect("add")
-            def on_add(sel):
-                xvals = line_close.get_xdata(); yvals = line_close.get_ydata()
-                idx = getattr(sel, 'index', None)
-                try:
-                    idx = int(round(idx)) if idx is not None else None
-                except Exception:
-                    idx = None
-                n = len(x_idx)
-                if idx is None or idx < 0 or idx >= n:
-                    try:
-                        tx = float(sel.target[0]) if hasattr(sel, 'target') else float(x_idx[-1])
-                    except Exception:
-                        tx = float(n-1)
-                    xv = np.asarray(xvals, dtype=float)
-                    idx = int(np.argmin(np.abs(xv - tx)))
-                d = ohlc_df['date'].iloc[idx]
-                o = ohlc_df['open'].iloc[idx]; h = ohlc_df['high'].iloc[idx]; l = ohlc_df['low'].iloc[idx]; c = ohlc_df['close'].iloc[idx]
-                base_txt = f"{pd.to_datetime(d).date()}\n开:{o:.2f} 高:{h:.2f} 低:{l:.2f} 收:{c:.2f}"
-                trades_today = trade_map.get(pd.to_datetime(d).date(), [])
-                if trades_today:
-                    base_txt += "\n" + " | ".join(trades_today)
-                sel.annotation.set(text=base_txt)
-        except Exception:
-            pass
-
-        # 滚轮缩放（以鼠标位置为中心）
-        try:
-            if hasattr(self, '_scroll_cid') and self._scroll_cid:
-                self.canvas.mpl_disconnect(self._scroll_cid)
-            def _on_scroll(event):
-                if event.inaxes not in (ax_price, ax_macd, ax_vol):
-                    return
-                import numpy as np
-                cur_axes = ax_price
-                xmin, xmax = cur_axes.get_xlim()
-                xdata = event.xdata if event.xdata is not None else (xmin + xmax)/2
-                span = (xmax - xmin)
-                if event.button == 'up':
-                    scale = 0.8
-                elif event.button == 'down':
-                    scale = 1.25
-                else:
-                    scale = 1.0
-                new_span = max(5, span * scale)
-                left = xdata - new_span/2
-                right = xdata + new_span/2
-                cur_axes.set_xlim(left, right)
+        # Hover：单一浮窗（日期+OHLC+当日交易摘要），文本按 K 线一次性格式化，事件回调只按下标取用；
+        # 价格取原始双精度，保证两位小数舍入不变
+        days = pd.DatetimeIndex(ohlc_df['date']).date
+        self._chart_hover_texts = [f"{d}\n开:{o_:.2f} 高:{h_:.2f} 低:{l_:.2f} 收:{c_:.2f}"
+                                   + ("\n" + " | ".join(trade_map[d]) if d in trade_map else "")
+                                   for d, o_, h_, l_, c_ in zip(days, *(ohlc_df[k].to_numpy(dtype=float)
+                                                                        for k in ('open', 'high', 'low', 'close')))]
+        self._chart_close = c
+        self._chart_hover_idx = -1
+        self._chart_annot.set_visible(False)
+
+        # 数据已替换，重置工具栏的视图历史，避免“复位”回到上一次的坐标范围
+        if self.chart_toolbar is not None:
+            self.chart_toolbar.update()
+        self.canvas.draw_idle()
+
+    def _on_chart_hover(self, event):
+        # 不做按时间 (如 20ms) 的节流：指针仍在同一根 K 线内时下方直接返回，只有换到新 bar 才更新；
+        # draw_idle 只登记重绘，Qt 在一次事件循环内把多次请求合并为一次绘制。按时间丢弃事件反而可能
+        # 丢掉最后一次移动，使提示框停在旧 bar 上。_on_equity_hover 同理。
+        annot = self._chart_annot
+        n = len(self._chart_hover_texts)
+        idx = int(round(event.xdata)) if (event.inaxes is self.ax_price and event.xdata is not None) else -1
+        if idx < 0 or idx >= n:
+            if annot.get_visible():
+                annot.set_visible(False)
+                self._chart_hover_idx = -1
                 self.canvas.draw_idle()
-            self._scroll_cid = self.canvas.mpl_connect('scroll_event', _on_scroll)
-        except Exception:
-            pass
-
-        self.fig.tight_layout()
-        self.canvas.draw()
+            return
+        if idx == self._chart_hover_idx:
+            return
+        self._chart_hover_idx = idx
+        annot.xy = (idx, self._chart_close[idx])
+        # 右半边（按当前可见范围）向左展开，避免提示框超出画布
+        xmin, xmax = self.ax_price.get_xlim()
+        right = idx > (xmin + xmax) / 2
+        annot.set_position((-15 if right else 15, 15))
+        annot.set_horizontalalignment('right' if right else 'left')
+        annot.set_text(self._chart_hover_texts[idx])
+        annot.set_visible(True)
+        self.canvas.draw_idle()
+
+    def _on_chart_scroll(self, event):
+        """滚轮缩放（以鼠标位置为中心）。"""
+        if event.inaxes not in (self.ax_price, self.ax_macd, self.ax_vol):
+            return
+        xmin, xmax = self.ax_price.get_xlim()
+        xdata = event.xdata if event.xdata is not None else (xmin + xmax)/2
+        if event.button == 'up':
+            scale = 0.8
+        elif event.button == 'down':
+            scale = 1.25
+        else:
+            scale = 1.0
+        new_span = max(5, (xmax - xmin) * scale)
+        self.ax_price.set_xlim(xdata - new_span/2, xdata + new_span/2)
+        self.canvas.draw_idle()
 
     def update_equity_chart(self, equity_curve: pd.DataFrame, trades_df: pd.DataFrame):
-        self.equity_fig.clear()
-        ax = self.equity_fig.add_subplot(1,1,1)
-        ax.set_title("策略收益曲线")
-        ax.plot(equity_curve['date'], equity_curve['value'], label='净值', color='orange')
-        ax.grid(alpha=0.3)
+        ax = self.equity_ax
+        # 列式取出 (SoA)：绘图与悬停均直接索引 numpy 数组，避免逐行 DataFrame 访问
+        dates = equity_curve['date'].to_numpy()
+        values = equity_curve['value'].to_numpy(dtype=float)
+        held_names = [s for s in getattr(self, 'last_selected_names', []) if s in equity_curve.columns]
+        held = equity_curve[held_names].to_numpy(dtype=float) if held_names else np.empty((len(values), 0))
+        initial_val = float(values[0]) if len(values) else 1.0
+        # 悬停查找与文本预先算好：日期数值 (二分查找用)，每个点的提示文本按下标一次性生成
+        xnums = mdates.date2num(dates)
+        days = pd.DatetimeIndex(dates).date
+        nav_txt = np.char.mod('%.2f', values)
+        pct_txt = np.char.mod('%.2f', (values / initial_val - 1.0) * 100)
+        buys_map, sells_map = {}, {}
+        if not trades_df.empty:
+            # entry_date / exit_date 在 trade_records 中是 date 对象
+            buys_map = trades_df.groupby('entry_date', sort=False)['symbol'].agg(','.join).to_dict()
+            sells_map = trades_df.groupby('exit_date', sort=False)['symbol'].agg(','.join).to_dict()
+        labels = []
+        for i, day in enumerate(days):
+            lines = [f"{day}", f"净值:{nav_txt[i]}", f"收益:{pct_txt[i]}%"]
+            trade_parts = []
+            if day in buys_map:
+                trade_parts.append("买:" + buys_map[day])
+            if day in sells_map:
+                trade_parts.append("卖:" + sells_map[day])
+            if trade_parts:
+                lines.append(" ".join(trade_parts))
+            # 持仓信息：equity_curve 同名列中的非零持仓
+            holding_parts = [f"{sym}:{int(size)}" for sym, size in zip(held_names, held[i]) if size]
+            if holding_parts:
+                lines.append("持仓:" + ",".join(holding_parts))
+            labels.append("\n".join(lines))
+        # 绘图只需屏幕精度，用 float32 减半拷贝进后端的数据量；悬停数值仍取 float64
+        self.equity_line.set_data(dates, values.astype(np.float32))
+        ax.relim()
+        ax.autoscale_view()
         self.equity_fig.autofmt_xdate()
-        # Hover
-        try:
-            cursor = mplcursors.cursor(ax.lines, hover=True)
-            @cursor.connect("add")
-            def on_add(sel):
-                import numpy as np
-                line = sel.artist
-                x, y = line.get_data()
-                # sel.index 可能是浮点或异常值，做鲁棒处理
-                idx = getattr(sel, 'index', None)
-                try:
-                    idx = int(round(idx)) if idx is not None else None
-                except Exception:
-                    idx = None
-                # 趋近最近点
-                if idx is None or idx < 0 or idx >= len(x):
-                    try:
-                        tx = sel.target[0]
-                        idx = int(np.argmin(np.abs(np.asarray(x) - tx)))
-                    except Exception:
-                        idx = max(0, min(len(x)-1, 0))
-                d = pd.to_datetime(x[idx])
-                initial_val = float(equity_curve['value'].iloc[0]) if not equity_curve.empty else 1.0
-                val = float(y[idx])
-                pct = (val / initial_val - 1.0) * 100
-                # 当日买卖点（匹配 entry_date / exit_date）
-                hover_date = d.date()
-                buys = []
-                sells = []
-                if not trades_df.empty:
-                    # entry_date / exit_date 在 trade_records 中是 date 对象
-                    buys = trades_df[trades_df['entry_date'] == hover_date]['symbol'].tolist()
-                    sells = trades_df[trades_df['exit_date'] == hover_date]['symbol'].tolist()
-                buys_txt = ("买:" + ",".join(buys)) if buys else ""
-                sells_txt = ("卖:" + ",".join(sells)) if sells else ""
-                trade_txt = (buys_txt + (" " if buys_txt and sells_txt else "") + sells_txt).strip()
-                # 持仓信息：从 equity_curve 的同名列读取非零持仓
-                holding_parts = []
-                try:
-                    for sym in getattr(self, 'last_selected_names', []):
-                        if sym in equity_curve.columns:
-                            size = equity_curve[sym].iloc[idx]
-                            if size and float(size) != 0.0:
-                                holding_parts.append(f"{sym}:{int(size)}")
-                except Exception:
-                    pass
-                holding_txt = ("持仓:" + ",".join(holding_parts)) if holding_parts else ""
-                if trade_txt and holding_txt:
-                    sel.annotation.set(text=f"{hover_date}\n净值:{val:.2f}\n收益:{pct:.2f}%\n{trade_txt}\n{holding_txt}")
-                elif trade_txt:
-                    sel.annotation.set(text=f"{hover_date}\n净值:{val:.2f}\n收益:{pct:.2f}%\n{trade_txt}")
-                elif holding_txt:
-                    sel.annotation.set(text=f"{hover_date}\n净值:{val:.2f}\n收益:{pct:.2f}%\n{holding_txt}")
-                else:
-                    sel.annotation.set(text=f"{hover_date}\n净值:{val:.2f}\n收益:{pct:.2f}%")
-        except Exception:
-            pass
-        self.equity_fig.tight_layout()
-        self.equity_canvas.draw()
+        self._equity_xnums, self._equity_values, self._equity_labels = xnums, values, labels
+        self._equity_hover_idx = -1
+        self._equity_annot.set_visible(False)
+        self.equity_canvas.draw_idle()
+
+    def _on_equity_hover(self, event):
+        # 同 _on_chart_hover：最近点下标不变时直接返回、重绘经 draw_idle 合并，无需再按时间节流
+        annot = self._equity_annot
+        if event.inaxes is not self.equity_ax or event.xdata is None or not self._equity_labels:
+            if annot.get_visible():
+                annot.set_visible(False)
+                self._equity_hover_idx = -1
+                self.equity_canvas.draw_idle()
+            return
+        idx = _nearest_index(self._equity_xnums, event.xdata)
+        if idx == self._equity_hover_idx:
+            return
+        self._equity_hover_idx = idx
+        annot.xy = (self._equity_xnums[idx], self._equity_values[idx])
+        # 右半边向左展开，避免提示框超出画布
+        right = idx > len(self._equity_labels) // 2
+        annot.set_position((-15 if right else 15, 15))
+        annot.set_horizontalalignment('right' if right else 'left')
+        annot.set_text(self._equity_labels[idx])
+        annot.set_visible(True)
+        self.equity_canvas.draw_idle()
 
     def update_trades_table(self, trades_df: pd.DataFrame):
-        self.trades_table.setRowCount(0)
-        if trades_df.empty:
-            return
-        for _, row in trades_df.iterrows():
-            r = self.trades_table.rowCount()
-            self.trades_table.insertRow(r)
-            vals = [
-                row.get('symbol',''),
-                str(row.get('entry_date','')),
-                str(row.get('exit_date','')),
-                f"{row.get('entry_price',0):.2f}" if row.get('entry_price') else '',
-                f"{row.get('exit_price',0):.2f}" if row.get('exit_price') else '',
-                str(row.get('size','')),
-                f"{row.get('pnl_pct',0)*100:.2f}" if row.get('pnl_pct') is not None else '',
-                str(row.get('holding_days','')),
-            ]
-            for c,val in enumerate(vals):
-                self.trades_table.setItem(r,c,QTableWidgetItem(val))
+        self.trades_model.set_trades(trades_df)
         self.trades_table.resizeColumnsToContents()
 
     def reload_app(self):
-        self.log("重载应用: 重新加载模块并重建界面 ...")
+        self.log("重载应用: 重新加载模块并刷新界面 ...")
         import importlib, sys
-        mods = ['strategy','data_loader','backtest','src.strategy','src.data_loader','src.backtest']
+        mods = ['strategy_kernels','strategy','data_loader','backtest','src.strategy_kernels','src.strategy','src.data_loader','src.backtest']
         for m in mods:
             if m in sys.modules:
                 try:
@@ -581,11 +731,34 @@ class MainWindow(QMainWindow):
                     self.log(f"模块 {m} 重载成功")
                 except Exception as e:
                     self.log(f"模块 {m} 重载失败: {e}")
-        # 重新构建界面
-        old = self.centralWidget()
-        if old:
-            old.deleteLater()
-        self._init_ui()
+        # 只刷新依赖这些模块的控件；窗口、布局与画布保留，不再整体重建界面
+        strategy_mod = sys.modules.get('src.strategy') or sys.modules.get('strategy')
+        loader_mod = sys.modules.get('src.data_loader') or sys.modules.get('data_loader')
+        strategy_map = getattr(strategy_mod, 'STRATEGY_MAP', None) or STRATEGY_MAP
+        self._populate_strategy_combo(strategy_map, getattr(strategy_mod, 'DEFAULT_STRATEGY_NAME', DEFAULT_STRATEGY_NAME))
+        self._populate_stock_list(getattr(loader_mod, 'NORMALIZED_OPTIONS', NORMALIZED_OPTIONS))
+        # 取数逻辑可能已变化，丢弃内存中的行情
+        with _DATA_CACHE_LOCK:
+            _DATA_CACHE.clear()
+        self._reset_results()
         self.log("重载完成。")
 
+    def _reset_results(self):
+        """清空上一次回测的结果：指标、交易明细、主图选择与两张图表。"""
+        self.update_table({})
+        self.trades_model.set_trades(None)
+        with QSignalBlocker(self.primary_combo):
+            self.primary_combo.clear()
+        self.primary_combo.setEnabled(False)
+        self.ohlc_map = {}
+        self.last_trades_df = pd.DataFrame()
+        self.fig.clear()
+        self._init_chart_axes()
+        if self.chart_toolbar is not None:
+            self.chart_toolbar.update()
+        self.canvas.draw_idle()
+        self.equity_fig.clear()
+        self._init_equity_axes()
+        self.equity_canvas.draw_idle()
+
 __all__ = ['MainWindow']
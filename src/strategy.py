@@ -8,9 +8,242 @@
 并支持多标的：对每个 data 单独进行信号判断与下单，统计汇总交易次数与胜率。
 """
 from __future__ import annotations
+import math
 import backtrader as bt
+import numpy as np
+import pandas as pd
 
-class BaseMultiDataStrategy(bt.Strategy):
+try:
+    from .strategy_kernels import tarmac_check, warmup_kernels
+except ImportError:
+    from strategy_kernels import tarmac_check, warmup_kernels  # type: ignore
+
+try:
+    import bottleneck as bn
+except ImportError:  # bottleneck 为可选加速依赖，缺失时窗口和用 np.cumsum 求
+    bn = None
+
+# 逐 bar 使用的模块函数预先绑定为模块级名字，省去每次对 bt 的属性查找
+_num2date = bt.num2date
+
+# 整数值序列 (如成交量) 的累加在绝对值总和不超过 2**53 时在 float64 下无舍入误差
+_EXACT_SUM_LIMIT = float(2 ** 53)
+
+
+def _line_array(line) -> np.ndarray:
+    """复制一条已预加载的 line 缓冲为 float64 数组 (不用 frombuffer，避免锁住 array.array 的扩容)。"""
+    return np.array(line.array, dtype=np.float64)
+
+
+def _datas_preloaded(datas) -> bool:
+    """策略 __init__ 时各 data 是否已整段预加载：预加载后缓冲已装满 (buflen() > 0) 而游标仍在首根之前 (len == 0)；
+    流式加载 (preload=False、exactbars、实盘) 时此刻缓冲为空。只依赖 line 缓冲的公开接口。
+    """
+    return bool(datas) and all(d.buflen() > 0 and len(d) == 0 for d in datas)
+
+
+def _cumsum_window_sums(x: np.ndarray, period: int) -> np.ndarray:
+    """长度为 len(x)-period+1 的滑动窗口和 (np.cumsum 差分)；仅对 _sma 判定为可精确累加的整数值序列使用。"""
+    csum = np.concatenate(([0.0], np.cumsum(x)))
+    return csum[period:] - csum[:-period]
+
+
+def _bn_window_sums(x: np.ndarray, period: int) -> np.ndarray:
+    """同 _cumsum_window_sums，由 bottleneck.move_sum 计算。"""
+    return bn.move_sum(x, window=period, min_count=period)[period - 1:]
+
+
+# 后端核对用的固定整数样本 (确定性序列，不依赖随机数)：窗口和远小于 2**53，两条路径都应给出精确值
+_WINDOW_SUMS_PROBE = ((np.arange(512, dtype=np.int64) * 7919) % 1000003 * 997).astype(np.float64)
+
+
+def _window_sums_agree(func) -> bool:
+    """核对 func 与 np.cumsum 差分在 _WINDOW_SUMS_PROBE 上给出的窗口和逐位相同。"""
+    return all(np.array_equal(func(_WINDOW_SUMS_PROBE, w), _cumsum_window_sums(_WINDOW_SUMS_PROBE, w))
+               for w in (1, 5, 20, 60))
+
+
+# 窗口和后端在首次调用 _sma 时选定：bottleneck 可用且与 np.cumsum 核对一致时用 bottleneck，否则用 np.cumsum。
+# 置为 None 会在下次调用时重新选择；测试可直接赋值以固定某一后端。
+_window_sums = None
+
+
+def _select_window_sums():
+    global _window_sums
+    if bn is not None and _window_sums_agree(_bn_window_sums):
+        _window_sums = _bn_window_sums
+    else:
+        _window_sums = _cumsum_window_sums
+    return _window_sums
+
+
+def _sma(x: np.ndarray, period: int) -> np.ndarray:
+    """与 bt.indicators.SMA 逐位一致：窗口 math.fsum / period，不足周期处为 NaN。"""
+    out = np.full(len(x), np.nan)
+    if len(x) < period:
+        return out
+    if np.abs(x).sum() <= _EXACT_SUM_LIMIT and np.array_equal(x, np.trunc(x)):
+        # 整数值且总和可精确表示：滑动窗口和本身即精确值，与 fsum 相同，除以 period 后逐位一致
+        out[period - 1:] = (_window_sums or _select_window_sums())(x, period) / period
+    else:
+        vals = x.tolist()  # fsum 遍历 Python float 列表远快于遍历 numpy 行
+        out[period - 1:] = [math.fsum(vals[i:i + period]) / period for i in range(len(vals) - period + 1)]
+    return out
+
+
+def _ema(x: np.ndarray, period: int, start: int = 0) -> np.ndarray:
+    """与 bt.indicators.EMA 逐位一致：以 start 起第一个完整窗口的 SMA 为种子，之后 prev*(1-alpha) + x*alpha。"""
+    out = np.full(len(x), np.nan)
+    seed = start + period - 1
+    if seed >= len(x):
+        return out
+    alpha = 2.0 / (1.0 + period)
+    alpha1 = 1.0 - alpha
+    vals = x.tolist()
+    prev = math.fsum(vals[start:seed + 1]) / period
+    res = [prev]
+    for v in vals[seed + 1:]:
+        prev = prev * alpha1 + v * alpha
+        res.append(prev)
+    out[seed:] = res
+    return out
+
+
+def _pct_change(close: np.ndarray) -> np.ndarray:
+    """逐日涨幅 (%)：(close[j] - close[j-1]) / close[j-1] * 100，首日或前收为 0 处为 NaN。"""
+    out = np.full(len(close), np.nan)
+    if len(close) > 1:
+        prev = close[:-1]
+        np.divide(close[1:] - prev, prev, out=out[1:], where=prev != 0)
+        out[1:] *= 100.0
+    return out
+
+
+def _body_pct(open_: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """K 线实体 (%)：(close - open) / open * 100，开盘为 0 处为 0。"""
+    out = np.zeros(len(close))
+    np.divide(close - open_, open_, out=out, where=open_ != 0)
+    return out * 100.0
+
+
+# 交易明细的结构化记录格式。symbol 用 object 而非定长字节串：标的名多为中文，定长 'S' 无法编码且可能截断。
+TRADE_DTYPE = np.dtype([
+    ('symbol', 'O'),
+    ('entry_date', 'datetime64[D]'),
+    ('exit_date', 'datetime64[D]'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('size', 'i8'),
+    ('pnl_pct', 'f8'),
+    ('holding_days', 'i8'),
+])
+
+
+class _TradeRecordMixin:
+    """交易明细存于预分配的结构化数组，满时容量翻倍；trade_records 返回已写入部分的视图。
+    缺失的买入价/日期分别记为 NaN/NaT。
+    """
+
+    def _init_trade_records(self, capacity: int = 256):
+        self._trade_arr = np.empty(capacity, dtype=TRADE_DTYPE)
+        self._trade_len = 0
+
+    def _append_trade(self, symbol, entry_date, exit_date, entry_price, exit_price, size, pnl_pct, holding_days):
+        if self._trade_len == len(self._trade_arr):
+            self._trade_arr = np.resize(self._trade_arr, 2 * len(self._trade_arr))
+        self._trade_arr[self._trade_len] = (symbol, entry_date, exit_date, entry_price, exit_price, size, pnl_pct, holding_days)
+        self._trade_len += 1
+
+    def _append_trades(self, symbols, entry_dates, exit_dates, entry_prices, exit_prices, sizes, pnl_pct, holding_days):
+        """批量追加交易明细：各参数为等长数组，按字段整体拷贝进缓冲。"""
+        start = self._trade_len
+        end = start + len(entry_prices)
+        if end > len(self._trade_arr):
+            self._trade_arr = np.resize(self._trade_arr, max(end, 2 * len(self._trade_arr)))
+        block = self._trade_arr[start:end]
+        block['symbol'] = symbols
+        block['entry_date'] = entry_dates
+        block['exit_date'] = exit_dates
+        block['entry_price'] = entry_prices
+        block['exit_price'] = exit_prices
+        block['size'] = sizes
+        block['pnl_pct'] = pnl_pct
+        block['holding_days'] = holding_days
+        self._trade_len = end
+
+    @property
+    def trade_records(self) -> np.ndarray:
+        return self._trade_arr[:self._trade_len]
+
+    def _init_entries(self, n: int):
+        """每标的最近一次买入的价格/日期 (NaN/NaT 占位)，_last_buy_active 标记是否有未平仓的买入记录。"""
+        self._last_buy_price = np.full(n, np.nan)
+        self._last_buy_date = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+        self._last_buy_active = np.zeros(n, dtype=bool)
+
+    def _open_entry(self, i: int, price, day):
+        self._last_buy_price[i] = price
+        self._last_buy_date[i] = day
+        self._last_buy_active[i] = True
+
+    def _entry(self, i: int):
+        """标的 i 的 (买入价, 买入日期)；无未平仓记录时为 (None, None)。"""
+        if not self._last_buy_active[i]:
+            return None, None
+        return float(self._last_buy_price[i]), self._last_buy_date[i].item()
+
+    def _settle_entries(self, active, symbols, exit_dates, exit_prices, sizes):
+        """回测结束时一次性结算 active 掩码选中的未平仓买入 (按标的顺序)：记交易明细并累计交易数/胜场。
+        参数均按 self.datas 顺序排列，exit_dates 可为单个日期 (所有标的共用)。
+        与逐笔记录一致：买入价为 0 时收益记 0，买入日期缺失时持有天数记 0。
+        """
+        if not active.any():
+            return
+        entry_prices = self._last_buy_price[active]
+        entry_dates = self._last_buy_date[active]
+        exit_prices = exit_prices[active]
+        exit_dates = np.broadcast_to(np.asarray(exit_dates, dtype='datetime64[D]'), active.shape)[active]
+        pnl_pct = np.zeros(len(entry_prices))
+        np.divide(exit_prices - entry_prices, entry_prices, out=pnl_pct, where=entry_prices != 0)
+        held = exit_dates - entry_dates
+        holding_days = np.where(np.isnat(held), 0, held.astype(np.int64))
+        self._append_trades(np.asarray(symbols, dtype=object)[active], entry_dates, exit_dates,
+                            entry_prices, exit_prices, sizes[active], pnl_pct, holding_days)
+        self.trades += int(np.count_nonzero(active))
+        self.wins += int(np.count_nonzero(exit_prices > entry_prices))
+
+
+class _PositionHistoryMixin:
+    """每日持仓快照存于 (bar, 标的) 的 int64 矩阵，容量按最长数据预分配、不足时翻倍；
+    pos_history 按需拼成 DataFrame (date 列 + 每标的一列)。
+    """
+
+    def _init_pos_history(self, names):
+        capacity = max((d.buflen() for d in self.datas), default=0) or 256
+        self._pos_names = names
+        self._pos_matrix = np.empty((capacity, len(names)), dtype=np.int64)
+        self._pos_dates = np.empty(capacity, dtype='datetime64[D]')
+        self._pos_len = 0
+
+    def _append_positions(self, cur_date, sizes):
+        n = self._pos_len
+        if n == len(self._pos_dates):
+            self._pos_matrix = np.concatenate([self._pos_matrix, np.empty_like(self._pos_matrix)])
+            self._pos_dates = np.concatenate([self._pos_dates, np.empty_like(self._pos_dates)])
+        self._pos_dates[n] = cur_date
+        self._pos_matrix[n] = sizes
+        self._pos_len = n + 1
+
+    @property
+    def pos_history(self) -> pd.DataFrame:
+        n = self._pos_len
+        # 同名标的与原先逐日 dict 一样后者覆盖前者
+        cols = {'date': self._pos_dates[:n]}
+        cols.update((name, self._pos_matrix[:n, j]) for j, name in enumerate(self._pos_names))
+        return pd.DataFrame(cols)
+
+
+class BaseMultiDataStrategy(_TradeRecordMixin, _PositionHistoryMixin, bt.Strategy):
     """多标的基础策略父类，封装统计逻辑。
     子类只需实现 per_data_signal(data, i) 返回 (buy_signal, sell_signal, volume_ok)。
 
@@ -23,104 +256,120 @@ class BaseMultiDataStrategy(bt.Strategy):
     def __init__(self):
         self.trades = 0
         self.wins = 0
-        self.last_buy_price = {}
-        self.last_buy_date = {}
-        self.vol_ma_map = {}
-        self.trade_records = []  # 记录每笔交易明细
-        self.pos_history = []    # 记录每日持仓 (date, 每标的持仓数量)
+        # 逐标的状态按 self.datas 的下标 i 存放在列表中，逐 bar 访问不再以 data 对象做字典查找
+        self._n_datas = len(self.datas)
+        self._target_weight = 1.0 / self._n_datas if self._n_datas else 0.0  # 每标的平分资金 (1 / N)
+        self._init_entries(self._n_datas)
+        self.vol_ma = []
+        self._init_trade_records()  # 记录每笔交易明细
+        # 标的名 (无名时用 data{i}) 只在此解析一次，交易明细与持仓快照共用
+        self._names = [d._name or f'data{j}' for j, d in enumerate(self.datas)]
+        self._init_pos_history(self._names)  # 记录每日持仓 (date, 每标的持仓数量)
+        # 预加载模式下整段行情已在内存：指标一次性按数组算好，逐 bar 只按下标读取；
+        # 非预加载 (流式/实盘) 时退回 Backtrader 指标对象。
+        # 不再创建指标后策略的 minperiod 不会自动抬高，由 _warmup 在 next 中补齐同样的预热期。
+        self._precomputed = _datas_preloaded(self.datas)
+        self._warmup = self.p.vol_window
+        # 参数在 __init__ 后不变：逐 bar 用到的提前取出，避免每次经 self.p 的参数描述符查找
+        self._vol_factor = self.p.vol_factor
+        self._warm = False
+        # 预计算模式下子类可给出逐标的的买入前置掩码 (按 bar 下标)：掩码为 False 时该 bar 不可能买入，
+        # 空仓标的直接跳过信号计算。None 表示不做过滤。
+        self._buy_mask = None
         for d in self.datas:
-            self.last_buy_price[d] = None
-            self.last_buy_date[d] = None
-            self.vol_ma_map[d] = bt.indicators.SimpleMovingAverage(d.volume, period=self.p.vol_window)  # type: ignore[attr-defined]
+            if self._precomputed:
+                self.vol_ma.append(_sma(_line_array(d.volume), self.p.vol_window))
+            else:
+                self.vol_ma.append(bt.indicators.SimpleMovingAverage(d.volume, period=self.p.vol_window))  # type: ignore[attr-defined]
+
+    def _view(self, data, sources, size):
+        """取信号计算所需的序列与当前下标。
+        预计算模式下返回整段数组与 len(data)-1；否则从 line/指标取最近 size 根组成小窗口，下标为 size-1。
+        """
+        if self._precomputed:
+            return sources, len(data) - 1
+        return [None if s is None else np.asarray(s.get(size=size), dtype=np.float64) for s in sources], size - 1
 
     def per_data_signal(self, data, i):  # 子类覆盖
         return False, False, False
 
     def next(self):
+        if self._precomputed and not self._warm:
+            if min(len(d) for d in self.datas) < self._warmup:
+                return
+            self._warm = True
+        # 当日日期每 bar 只换算一次；仅当某标的当前 bar 的时间与基准不同 (如停牌未更新) 时才单独换算
+        cur_num = self.datas[0].datetime[0]
+        current_date = _num2date(cur_num).date()
+        # 持仓在本 bar 内不会变化 (订单到下一 bar 才成交)，每标的只向 broker 取一次
+        getpos = self.getposition
+        positions = [getpos(d) for d in self.datas]
+        buy_mask = self._buy_mask
         for i, d in enumerate(self.datas):
+            pos = positions[i]
+            if buy_mask is not None and not pos and not buy_mask[i][len(d) - 1]:
+                continue
             buy_sig, sell_sig, vol_ok = self.per_data_signal(d, i)
-            pos = self.getposition(d)
             if not pos:
                 if buy_sig and vol_ok:
                     # 简化：每标的平分资金 (1 / N)
-                    self.order_target_percent(data=d, target=1.0/len(self.datas))
-                    self.last_buy_price[d] = d.close[0]
-                    self.last_buy_date[d] = bt.num2date(d.datetime[0]).date()
+                    self.order_target_percent(data=d, target=self._target_weight)
+                    dnum = d.datetime[0]
+                    self._open_entry(i, d.close[0], current_date if dnum == cur_num else _num2date(dnum).date())
             else:
                 if sell_sig:
                     self.order_target_percent(data=d, target=0.0)
                     self.trades += 1
-                    if self.last_buy_price[d] is not None and d.close[0] > self.last_buy_price[d]:
+                    entry_price, entry_date = self._entry(i)
+                    if entry_price is not None and d.close[0] > entry_price:
                         self.wins += 1
                     # 记录交易
-                    entry_price = self.last_buy_price[d]
                     exit_price = d.close[0]
-                    entry_date = self.last_buy_date[d]
-                    exit_date = bt.num2date(d.datetime[0]).date()
+                    dnum = d.datetime[0]
+                    exit_date = current_date if dnum == cur_num else _num2date(dnum).date()
                     pnl_pct = (exit_price - entry_price) / entry_price if entry_price else 0.0
                     holding_days = (exit_date - entry_date).days if entry_date else 0
-                    self.trade_records.append({
-                        'symbol': d._name or f'data{i}',
-                        'entry_date': entry_date,
-                        'exit_date': exit_date,
-                        'entry_price': entry_price,
-                        'exit_price': exit_price,
-                        'size': pos.size,
-                        'pnl_pct': pnl_pct,
-                        'holding_days': holding_days,
-                    })
-                    self.last_buy_price[d] = None
-                    self.last_buy_date[d] = None
+                    self._append_trade(self._names[i], entry_date, exit_date, entry_price, exit_price,
+                                       pos.size, pnl_pct, holding_days)
+                    self._last_buy_active[i] = False
         # 记录当日持仓
-        try:
-            cur_date = bt.num2date(self.datas[0].datetime[0]).date()
-            pos_row = {'date': cur_date}
-            for j, d in enumerate(self.datas):
-                key = d._name or f'data{j}'
-                pos_row[key] = self.getposition(d).size
-            self.pos_history.append(pos_row)
-        except Exception:
-            pass
+        self._append_positions(current_date, [pos.size for pos in positions])
 
     def stop(self):
-        # 统计未平仓
-        for d in self.datas:
-            pos = self.getposition(d)
-            if pos and self.last_buy_price[d] is not None:
-                self.trades += 1
-                if d.close[0] > self.last_buy_price[d]:
-                    self.wins += 1
-                # 记录强制平仓（以最后一个 bar 收盘价计算）
-                exit_date = bt.num2date(d.datetime[0]).date()
-                entry_price = self.last_buy_price[d]
-                exit_price = d.close[0]
-                entry_date = self.last_buy_date[d]
-                pnl_pct = (exit_price - entry_price) / entry_price if entry_price else 0.0
-                holding_days = (exit_date - entry_date).days if entry_date else 0
-                self.trade_records.append({
-                    'symbol': d._name or 'unknown',
-                    'entry_date': entry_date,
-                    'exit_date': exit_date,
-                    'entry_price': entry_price,
-                    'exit_price': exit_price,
-                    'size': pos.size,
-                    'pnl_pct': pnl_pct,
-                    'holding_days': holding_days,
-                })
+        # 统计未平仓：按最后一个 bar 收盘价 (各标的自身日期) 一次性结算
+        datas = self.datas
+        sizes = np.array([self.getposition(d).size for d in datas], dtype=np.int64)
+        active = (sizes != 0) & self._last_buy_active
+        if not active.any():
+            return
+        exit_prices = np.array([d.close[0] for d in datas], dtype=np.float64)
+        exit_dates = np.array([_num2date(d.datetime[0]).date() for d in datas], dtype='datetime64[D]')
+        self._settle_entries(active, self._names, exit_dates, exit_prices, sizes)
 
 class MacdVolumeStrategy(BaseMultiDataStrategy):
     def __init__(self):
         super().__init__()
-        self.macd_map = {}
+        self.macd_lines = []
+        # bt.indicators.MACD 默认 12/26/9，信号线在第 26+9-1 根形成
+        self._warmup = max(self._warmup, 26 + 9 - 1)
         for d in self.datas:
-            self.macd_map[d] = bt.indicators.MACD(d.close)  # type: ignore[attr-defined]
+            if self._precomputed:
+                close = _line_array(d.close)
+                macd = _ema(close, 12) - _ema(close, 26)
+                self.macd_lines.append((macd, _ema(macd, 9, start=26 - 1), _line_array(d.volume)))
+            else:
+                macd = bt.indicators.MACD(d.close)  # type: ignore[attr-defined]
+                self.macd_lines.append((macd.macd, macd.signal, d.volume))
+        if self._precomputed:
+            # 买入需放量: volume > vol_ma * vol_factor (与逐 bar 判断相同的运算)
+            self._buy_mask = [volume > vol_ma * self._vol_factor
+                              for (_, _, volume), vol_ma in zip(self.macd_lines, self.vol_ma)]
 
     def per_data_signal(self, data, i):
-        macd = self.macd_map[data]
-        vol_ma = self.vol_ma_map[data]
-        buy_cross = macd.macd[0] > macd.signal[0] and macd.macd[-1] <= macd.signal[-1]
-        sell_cross = macd.macd[0] < macd.signal[0] and macd.macd[-1] >= macd.signal[-1]
-        vol_ok = data.volume[0] > vol_ma[0] * self.p.vol_factor
+        (macd, signal, volume, vol_ma), k = self._view(data, (*self.macd_lines[i], self.vol_ma[i]), 2)
+        buy_cross = macd[k] > signal[k] and macd[k-1] <= signal[k-1]
+        sell_cross = macd[k] < signal[k] and macd[k-1] >= signal[k-1]
+        vol_ok = volume[k] > vol_ma[k] * self._vol_factor
         return buy_cross, sell_cross, vol_ok
 
 class SmaCrossVolumeStrategy(BaseMultiDataStrategy):
@@ -128,19 +377,30 @@ class SmaCrossVolumeStrategy(BaseMultiDataStrategy):
 
     def __init__(self):
         super().__init__()
-        self.sma_short = {}
-        self.sma_long = {}
+        self.sma_short = []
+        self.sma_long = []
+        self.volumes = []
+        self._warmup = max(self._warmup, self.p.short, self.p.long)
         for d in self.datas:
-            self.sma_short[d] = bt.indicators.SimpleMovingAverage(d.close, period=self.p.short)  # type: ignore[attr-defined]
-            self.sma_long[d] = bt.indicators.SimpleMovingAverage(d.close, period=self.p.long)  # type: ignore[attr-defined]
+            if self._precomputed:
+                close = _line_array(d.close)
+                self.sma_short.append(_sma(close, self.p.short))
+                self.sma_long.append(_sma(close, self.p.long))
+                self.volumes.append(_line_array(d.volume))
+            else:
+                self.sma_short.append(bt.indicators.SimpleMovingAverage(d.close, period=self.p.short))  # type: ignore[attr-defined]
+                self.sma_long.append(bt.indicators.SimpleMovingAverage(d.close, period=self.p.long))  # type: ignore[attr-defined]
+                self.volumes.append(d.volume)
+        if self._precomputed:
+            # 买入需放量: volume > vol_ma * vol_factor (与逐 bar 判断相同的运算)
+            self._buy_mask = [volume > vol_ma * self._vol_factor for volume, vol_ma in zip(self.volumes, self.vol_ma)]
 
     def per_data_signal(self, data, i):
-        short = self.sma_short[data]
-        long = self.sma_long[data]
-        vol_ma = self.vol_ma_map[data]
-        buy_cross = short[0] > long[0] and short[-1] <= long[-1]
-        sell_cross = short[0] < long[0] and short[-1] >= long[-1]
-        vol_ok = data.volume[0] > vol_ma[0] * self.p.vol_factor
+        sources = (self.sma_short[i], self.sma_long[i], self.volumes[i], self.vol_ma[i])
+        (short, long, volume, vol_ma), k = self._view(data, sources, 2)
+        buy_cross = short[k] > long[k] and short[k-1] <= long[k-1]
+        sell_cross = short[k] < long[k] and short[k-1] >= long[k-1]
+        vol_ok = volume[k] > vol_ma[k] * self._vol_factor
         return buy_cross, sell_cross, vol_ok
 
 class VolumeSurgeUpStrategy(BaseMultiDataStrategy):
@@ -156,38 +416,52 @@ class VolumeSurgeUpStrategy(BaseMultiDataStrategy):
     若 5 日均量尚未形成 (前期样本不足)，跳过信号。
     若成交额缺失，使用 volume * close * 100 作为近似 (假设一手=100)。
     """
-    params = (('vol_window', 20), ('vol_factor', 1.2))  # 继承仍会创建 vol_ma_map 供基础统计用
+    params = (('vol_window', 20), ('vol_factor', 1.2))  # 继承仍会创建 vol_ma 供基础统计用
 
     def __init__(self):
         super().__init__()
-        self.vol_ma5 = {}
+        self.vol_ma5 = []
+        self.bars = []
         for d in self.datas:
-            self.vol_ma5[d] = bt.indicators.SimpleMovingAverage(d.volume, period=5)  # type: ignore[attr-defined]
+            # 无成交额列时为 None，信号计算中用 volume * close * 100 近似
+            amount = d.amount if 'amount' in d.getlinealiases() else None
+            if self._precomputed:
+                volume = _line_array(d.volume)
+                amount = _line_array(amount) if amount is not None else None
+                self.bars.append((_line_array(d.open), _line_array(d.close), volume, amount))
+                self.vol_ma5.append(_sma(volume, 5))
+            else:
+                self.bars.append((d.open, d.close, d.volume, amount))
+                self.vol_ma5.append(bt.indicators.SimpleMovingAverage(d.volume, period=5))  # type: ignore[attr-defined]
+        if self._precomputed:
+            # 买入需成交额 >= 2亿 且 量比 >= 2；均量为 0 处掩码可能为真，交由逐 bar 判断
+            self._buy_mask = []
+            for (_, close, volume, amount), vol_ma5 in zip(self.bars, self.vol_ma5):
+                turnover = amount if amount is not None else volume * close * 100.0
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    self._buy_mask.append((turnover >= 200_000_000.0) & (volume / vol_ma5 >= 2.0))
 
     def per_data_signal(self, data, i):
+        (open_, close, volume, amount, vol_ma5), k = self._view(data, (*self.bars[i], self.vol_ma5[i]), 2)
         # 前一日收盘是否可用
-        if len(data.close) < 2:
+        if k < 1:
             return False, False, False
-        prev_close = data.close[-1]
+        prev_close = close[k-1]
         if prev_close == 0:
             return False, False, False
-        pct_change = (data.close[0] - prev_close) / prev_close * 100.0
-        # 成交额 (turnover)
-        try:
-            turnover = data.amount[0]
-        except Exception:
-            # 近似: volume * close * 100
-            turnover = data.volume[0] * data.close[0] * 100.0
-        vol_ma5_val = self.vol_ma5[data][0]
+        pct_change = (close[k] - prev_close) / prev_close * 100.0
+        # 成交额 (turnover)；缺失时近似: volume * close * 100
+        turnover = amount[k] if amount is not None else volume[k] * close[k] * 100.0
+        vol_ma5_val = vol_ma5[k]
         if vol_ma5_val == 0:
             return False, False, False
-        vol_ratio = data.volume[0] / vol_ma5_val
-        increase_ok = (pct_change >= 2.0) and (data.close[0] >= data.open[0])
+        vol_ratio = volume[k] / vol_ma5_val
+        increase_ok = (pct_change >= 2.0) and (close[k] >= open_[k])
         turnover_ok = turnover >= 200_000_000.0
         vol_surge_ok = vol_ratio >= 2.0
         buy_sig = increase_ok and turnover_ok and vol_surge_ok
         # 卖出：价格转弱或放量消退
-        sell_sig = (data.close[0] < data.open[0]) or (vol_ratio < 1.2)
+        sell_sig = (close[k] < open_[k]) or (vol_ratio < 1.2)
         vol_ok = turnover_ok and vol_surge_ok
         return buy_sig, sell_sig, vol_ok
 
@@ -213,72 +487,55 @@ class TarmacPlatformStrategy(BaseMultiDataStrategy):
 
     def __init__(self):
         super().__init__()
-        self.vol_ma5 = {}
+        self.vol_ma5 = []
+        self.bars = []
+        # 预计算模式下逐日涨幅与实体比例整段一次算好，形态判断只按下标读取
+        self.pct = []
+        self.body_pct = []
         for d in self.datas:
-            self.vol_ma5[d] = bt.indicators.SimpleMovingAverage(d.volume, period=5)  # type: ignore[attr-defined]
-
-    def _daily_pct(self, data, offset=0):
-        if len(data.close) < abs(offset) + 2:
-            return None
-        try:
-            prev = data.close[offset-1]
-            cur = data.close[offset]
-            if prev == 0:
-                return None
-            return (cur - prev) / prev * 100.0
-        except Exception:
-            return None
+            if self._precomputed:
+                open_, close, volume = _line_array(d.open), _line_array(d.close), _line_array(d.volume)
+                self.bars.append((open_, close, volume))
+                self.vol_ma5.append(_sma(volume, 5))
+                self.pct.append(_pct_change(close))
+                self.body_pct.append(_body_pct(open_, close))
+            else:
+                self.bars.append((d.open, d.close, d.volume))
+                self.vol_ma5.append(bt.indicators.SimpleMovingAverage(d.volume, period=5))  # type: ignore[attr-defined]
+        if self._precomputed:
+            # 买入需 3 个交易日前为放量上涨日，掩码按当前 bar 下标对齐 (前 3 根恒为 False)
+            self._buy_mask = []
+            for (open_, close, volume), vol_ma5, pct in zip(self.bars, self.vol_ma5, self.pct):
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    surge = (pct > self.p.surge_pct) & (close > open_) & (volume / vol_ma5 >= self.p.surge_vol_ratio)
+                mask = np.zeros(len(surge), dtype=bool)
+                mask[3:] = surge[:-3]
+                self._buy_mask.append(mask)
+        # 形态判断由编译内核完成，先触发编译，避免首个 next() 承担 JIT 开销
+        warmup_kernels()
+        self._check = self._build_checker()
+
+    def _build_checker(self):
+        """参数在 __init__ 之后不再变化，绑定为闭包局部量，逐 bar 判断时不再查 self.p。"""
+        p = self.p
+        surge_pct, surge_vol_ratio, body_pct_limit = p.surge_pct, p.surge_vol_ratio, p.body_pct_limit
+        confirm_max_pct, exit_drop_pct, exit_spike_pct = p.confirm_max_pct, p.exit_drop_pct, p.exit_spike_pct
+
+        def check(open_, close, pct, body_pct, volume, vol_ma5, k):
+            return tarmac_check(open_, close, pct, body_pct, volume, vol_ma5, k,
+                                surge_pct, surge_vol_ratio, body_pct_limit,
+                                confirm_max_pct, exit_drop_pct, exit_spike_pct)
+        return check
 
     def per_data_signal(self, data, i):
-        # 需要至少 4 根K线
-        if len(data.close) < 4:
-            return False, False, False
-        # surge day = index -3
-        surge_pct = self._daily_pct(data, -3)
-        if surge_pct is None:
-            return False, False, False
-        # 5日均量与放量判断 (surge day)
-        try:
-            vol_ma5_surge = self.vol_ma5[data][-3]
-        except Exception:
-            vol_ma5_surge = 0
-        if vol_ma5_surge == 0:
-            return False, False, False
-        vol_ratio_surge = data.volume[-3] / vol_ma5_surge
-        # surge day conditions
-        surge_ok = (
-            surge_pct > self.p.surge_pct and
-            data.close[-3] > data.open[-3] and
-            vol_ratio_surge >= self.p.surge_vol_ratio
-        )
-        if not surge_ok:
-            return False, False, False
-        # 检查接下三个确认日 (index -2, -1, 0)
-        for off in (-2, -1, 0):
-            pct = self._daily_pct(data, off)
-            if pct is None:
-                return False, False, False
-            body_pct = (data.close[off] - data.open[off]) / data.open[off] * 100.0 if data.open[off] != 0 else 0
-            high_open = data.open[off] > data.close[off-1]
-            cond = (
-                high_open and
-                data.close[off] > data.open[off] and
-                body_pct < self.p.body_pct_limit and
-                0.0 < pct <= self.p.confirm_max_pct
-            )
-            if not cond:
-                return False, False, False
-        # 若当前bar通过确认形态，构成买入
-        buy_sig = True
-        # 卖出逻辑
-        today_pct = self._daily_pct(data, 0)
-        sell_sig = False
-        if today_pct is not None:
-            if today_pct < self.p.exit_drop_pct or today_pct > self.p.exit_spike_pct or data.close[0] < data.open[0]:
-                sell_sig = True
-        # 将放量标识 vol_ok 简化为 surge day 的放量满足
-        vol_ok = True
-        return buy_sig, sell_sig, vol_ok
+        (open_, close, volume, vol_ma5), k = self._view(data, (*self.bars[i], self.vol_ma5[i]), 5)
+        if self._precomputed:
+            pct, body_pct = self.pct[i], self.body_pct[i]
+        else:
+            pct, body_pct = _pct_change(close), _body_pct(open_, close)
+        buy_sig, sell_sig = self._check(open_, close, pct, body_pct, volume, vol_ma5, k)
+        # 将放量标识 vol_ok 简化为 surge day 的放量满足 (形态成立即满足)
+        return buy_sig, sell_sig, buy_sig
 
 STRATEGY_MAP = {
     'MACD成交量': MacdVolumeStrategy,
@@ -289,7 +546,7 @@ STRATEGY_MAP = {
 
 DEFAULT_STRATEGY_NAME = 'MACD成交量'
 
-class MidCapRotationStrategy(bt.Strategy):
+class MidCapRotationStrategy(_TradeRecordMixin, _PositionHistoryMixin, bt.Strategy):
     """中规模轮动策略 (示例实现)
     参数来源: 用户给出的配置
     逻辑:
@@ -320,13 +577,38 @@ class MidCapRotationStrategy(bt.Strategy):
 
     def __init__(self):
         self.day_counter = 0
-        self.trade_records = []
-        self.pos_history = []
+        self._init_trade_records()
+        self._names = [d._name or 'unknown' for d in self.datas]
+        self._init_pos_history(self._names)
         # 保存最近买入价用于胜率统计 (简化)
-        self.last_buy_price = {d: None for d in self.datas}
-        self.last_buy_date = {d: None for d in self.datas}
+        self._init_entries(len(self.datas))
         self.trades = 0
         self.wins = 0
+        # 卖出阈值转成数组，命中数按整段/整行广播比较求得，不再逐阈值循环
+        self._sell_low = np.asarray(self.p.sell_conditions_low, dtype=np.float64)
+        self._sell_high = np.asarray(self.p.sell_conditions_high, dtype=np.float64)
+        # 逐 bar 用到的其余参数提前取出，避免每次经 self.p 的参数描述符查找；买入阈值同样转成数组做截面比较
+        self._buy_cond = np.asarray(self.p.buy_conditions, dtype=np.float64)
+        self._buy_min_hits = self.p.buy_at_least_count
+        self._sell_min_hits = self.p.sell_at_least_count
+        # 预加载模式下把各标的收盘价排成 (bar, 标的) 矩阵 P，一次性算出整段 ROC 矩阵、有效标记与卖出命中数，
+        # 逐 bar 只按各标的当前下标取一行；各标的长度可能不同，短的尾部补 NaN (对应下标永远取不到)。
+        self._precomputed = _datas_preloaded(self.datas)
+        if self._precomputed:
+            period = self.p.roc_period
+            closes = [_line_array(d.close) for d in self.datas]
+            P = np.full((max((len(c) for c in closes), default=0), len(closes)), np.nan)
+            for j, c in enumerate(closes):
+                P[:len(c), j] = c
+            self._roc_mat = np.full_like(P, np.nan)
+            self._roc_valid = np.zeros(P.shape, dtype=bool)
+            if len(P) > period:
+                prev = P[:-period] if period else P
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    self._roc_mat[period:] = P[period:] / prev - 1.0
+                self._roc_valid[period:] = prev != 0
+            self._sell_ok_mat, self._buy_ok_mat = self._signal_masks(self._roc_mat, self._roc_valid)
+            self._cols = np.arange(len(closes))
 
     def _roc(self, data, period):
         if len(data.close) <= period:
@@ -337,137 +619,116 @@ class MidCapRotationStrategy(bt.Strategy):
             return None
         return cur / prev - 1.0
 
+    def _sell_hits(self, roc):
+        """卖出命中数 = [任一 roc < 下限] + [任一 roc > 上限]；roc 可为向量或矩阵，NaN 不命中。"""
+        return ((roc[..., None] < self._sell_low).any(axis=-1).astype(np.int64)
+                + (roc[..., None] > self._sell_high).any(axis=-1))
+
+    def _signal_masks(self, roc, valid):
+        """(卖出条件达标, 买入候选) 掩码：ROC 有效且卖出/买入阈值命中数不少于要求；roc 可为向量或矩阵。"""
+        sell_ok = valid & (self._sell_hits(roc) >= self._sell_min_hits)
+        buy_ok = valid & ((roc[..., None] > self._buy_cond).sum(axis=-1) >= self._buy_min_hits)
+        return sell_ok, buy_ok
+
+    def _roc_vector(self, period):
+        """所有标的当前 bar 的 ROC、有效标记 (样本不足或前值为 0 时无效)、卖出达标与买入候选掩码，均按 self.datas 顺序。"""
+        if not self._precomputed:
+            rocs = [self._roc(d, period) for d in self.datas]
+            roc_arr = np.array([np.nan if r is None else r for r in rocs], dtype=np.float64)
+            valid = np.array([r is not None for r in rocs], dtype=bool)
+            return (roc_arr, valid, *self._signal_masks(roc_arr, valid))
+        idx = np.fromiter((len(d) - 1 for d in self.datas), dtype=np.intp, count=len(self.datas))
+        cols = self._cols
+        return self._roc_mat[idx, cols], self._roc_valid[idx, cols], self._sell_ok_mat[idx, cols], self._buy_ok_mat[idx, cols]
+
+    @staticmethod
+    def _rank_top(values, idx, k):
+        """idx 中按 values 降序取前 k 个下标；并列时下标小者在前，与 Python 稳定排序 reverse=True 的结果一致。
+        k 小于候选数时先用 np.partition 找出第 k 大的值，只对不小于它的候选做稳定排序。
+        """
+        if k <= 0 or not len(idx):
+            return idx[:0]
+        v = values[idx]
+        if k < len(v):
+            keep = v >= np.partition(v, len(v) - k)[len(v) - k]
+            idx, v = idx[keep], v[keep]
+        return idx[np.argsort(-v, kind='stable')[:k]]
+
+    def _submit_targets(self, targets, current_date, positions):
+        """按 {标的下标: 目标权重} 的顺序下单并登记: 权重为 0 视为清仓并记一笔交易，否则记录买入价与日期。
+        positions 为本 bar 已取出的各标的持仓。
+        """
+        for i, weight in targets.items():
+            d = self.datas[i]
+            pos = positions[i]
+            self.order_target_percent(d, weight)
+            if weight:
+                self._open_entry(i, d.close[0], current_date)
+                continue
+            entry_price, entry_date = self._entry(i)
+            exit_price = d.close[0]
+            exit_date = current_date
+            pnl_pct = (exit_price - entry_price)/entry_price if entry_price else 0.0
+            holding_days = (exit_date - entry_date).days if entry_date else 0
+            self._append_trade(self._names[i], entry_date, exit_date, entry_price, exit_price,
+                               pos.size, pnl_pct, holding_days)
+            self.trades += 1
+            if entry_price is not None and exit_price > entry_price:
+                self.wins += 1
+            self._last_buy_active[i] = False
+
     def next(self):
         self.day_counter += 1
-        current_date = bt.num2date(self.datas[0].datetime[0]).date()
+        current_date = _num2date(self.datas[0].datetime[0]).date()
 
         # 计算所有标的 ROC
-        roc_map = {}
-        for d in self.datas:
-            roc_val = self._roc(d, self.p.roc_period)
-            if roc_val is not None:
-                roc_map[d] = roc_val
-
-        # 卖出检查 (逐标的)
-        for d in list(self.datas):
-            pos = self.getposition(d)
-            if pos.size == 0:
-                continue
-            roc_val = roc_map.get(d, None)
-            if roc_val is None:
-                continue
-            sell_hits = 0
-            for low_thr in self.p.sell_conditions_low:
-                if roc_val < low_thr:
-                    sell_hits += 1; break
-            for high_thr in self.p.sell_conditions_high:
-                if roc_val > high_thr:
-                    sell_hits += 1; break
-            if sell_hits >= self.p.sell_at_least_count:
-                self.order_target_percent(d, 0.0)
-                entry_price = self.last_buy_price.get(d)
-                exit_price = d.close[0]
-                entry_date = self.last_buy_date.get(d)
-                exit_date = current_date
-                pnl_pct = (exit_price - entry_price)/entry_price if entry_price else 0.0
-                holding_days = (exit_date - entry_date).days if entry_date else 0
-                self.trade_records.append({
-                    'symbol': d._name or 'unknown',
-                    'entry_date': entry_date,
-                    'exit_date': exit_date,
-                    'entry_price': entry_price,
-                    'exit_price': exit_price,
-                    'size': pos.size,
-                    'pnl_pct': pnl_pct,
-                    'holding_days': holding_days,
-                })
-                self.trades += 1
-                if entry_price is not None and exit_price > entry_price:
-                    self.wins += 1
-                self.last_buy_price[d] = None
-                self.last_buy_date[d] = None
+        p = self.p
+        rocs, roc_ok, sell_ok, buy_ok = self._roc_vector(p.roc_period)
+        # 持仓在本 bar 内不会变化 (订单到下一 bar 才成交)，每标的只向 broker 取一次
+        getpos = self.getposition
+        positions = [getpos(d) for d in self.datas]
+
+        sizes = np.fromiter((pos.size for pos in positions), dtype=np.float64, count=len(positions))
+
+        # 本 bar 的目标权重 {标的下标: 权重}，按插入顺序下单：先阈值卖出，再卸载，最后买入；同一标的只下一次单。
+        # (持仓在成交前不变，同一标的两次 order_target_percent(0) 都按原持仓下单，第二次会开出空头)
+        # 卖出检查 (截面一次判断，按标的顺序)
+        targets = dict.fromkeys(np.flatnonzero(sell_ok & (sizes != 0)).tolist(), 0.0)
 
         # 轮动买入 (按 rebalance_days)
-        if self.day_counter % self.p.rebalance_days == 0 and roc_map:
-            # 构建买入候选列表
-            candidates = []
-            for d, roc_val in roc_map.items():
-                buy_hits = sum(1 for cond in self.p.buy_conditions if roc_val > cond)
-                if buy_hits >= self.p.buy_at_least_count:
-                    candidates.append((d, roc_val))
-            # 排序 & 选 topK
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            if self.p.dropN > 0:
-                candidates = candidates[self.p.dropN:]
-            target = [c[0] for c in candidates[: self.p.topK]]
+        if self.day_counter % p.rebalance_days == 0 and roc_ok.any():
+            # 买入候选: 命中买入阈值数达标的有效标的
+            candidates = np.flatnonzero(buy_ok)
+            # 按 ROC 降序排名，去掉前 dropN 个后取 topK
+            drop = max(p.dropN, 0)
+            target = self._rank_top(rocs, candidates, drop + p.topK)[drop:].tolist()
             target_set = set(target)
-            # 当前持仓集合
-            held_set = {d for d in self.datas if self.getposition(d).size > 0}
-            # 卸载不在目标内的持仓
-            for d in held_set - target_set:
-                self.order_target_percent(d, 0.0)
-                pos = self.getposition(d)
-                entry_price = self.last_buy_price.get(d)
-                exit_price = d.close[0]
-                entry_date = self.last_buy_date.get(d)
-                exit_date = current_date
-                pnl_pct = (exit_price - entry_price)/entry_price if entry_price else 0.0
-                holding_days = (exit_date - entry_date).days if entry_date else 0
-                self.trade_records.append({
-                    'symbol': d._name or 'unknown',
-                    'entry_date': entry_date,
-                    'exit_date': exit_date,
-                    'entry_price': entry_price,
-                    'exit_price': exit_price,
-                    'size': pos.size,
-                    'pnl_pct': pnl_pct,
-                    'holding_days': holding_days,
-                })
-                self.trades += 1
-                if entry_price is not None and exit_price > entry_price:
-                    self.wins += 1
-                self.last_buy_price[d] = None
-                self.last_buy_date[d] = None
+            # 卸载不在目标内的持仓 (已因阈值卖出的不再重复下单)
+            for i in np.flatnonzero(sizes > 0).tolist():
+                if i not in target_set:
+                    targets.setdefault(i, 0.0)
             # 买入新的目标
             if target:
                 weight = 1.0 / len(target)
-                for d in target:
-                    if self.getposition(d).size == 0:
-                        self.order_target_percent(d, weight)
-                        self.last_buy_price[d] = d.close[0]
-                        self.last_buy_date[d] = current_date
+                for i in target:
+                    if positions[i].size == 0:
+                        targets[i] = weight
+
+        self._submit_targets(targets, current_date, positions)
 
         # 记录持仓快照
-        snapshot = {'date': current_date}
-        for d in self.datas:
-            snapshot[d._name or 'unknown'] = self.getposition(d).size
-        self.pos_history.append(snapshot)
+        self._append_positions(current_date, [pos.size for pos in positions])
 
     def stop(self):
-        # 强制平仓剩余持仓（统计）
-        current_date = bt.num2date(self.datas[0].datetime[0]).date() if self.datas else None
-        for d in self.datas:
-            pos = self.getposition(d)
-            if pos.size > 0 and self.last_buy_price.get(d) is not None:
-                exit_price = d.close[0]
-                entry_price = self.last_buy_price[d]
-                entry_date = self.last_buy_date[d]
-                exit_date = current_date
-                pnl_pct = (exit_price - entry_price)/entry_price if entry_price else 0.0
-                holding_days = (exit_date - entry_date).days if entry_date else 0
-                self.trade_records.append({
-                    'symbol': d._name or 'unknown',
-                    'entry_date': entry_date,
-                    'exit_date': exit_date,
-                    'entry_price': entry_price,
-                    'exit_price': exit_price,
-                    'size': pos.size,
-                    'pnl_pct': pnl_pct,
-                    'holding_days': holding_days,
-                })
-                self.trades += 1
-                if entry_price is not None and exit_price > entry_price:
-                    self.wins += 1
+        # 强制平仓剩余持仓（统计），统一按 datas[0] 的最后日期一次性结算
+        datas = self.datas
+        sizes = np.array([self.getposition(d).size for d in datas], dtype=np.int64)
+        active = (sizes > 0) & self._last_buy_active
+        if not active.any():
+            return
+        current_date = _num2date(datas[0].datetime[0]).date()
+        exit_prices = np.array([d.close[0] for d in datas], dtype=np.float64)
+        self._settle_entries(active, self._names, current_date, exit_prices, sizes)
 
 STRATEGY_MAP['中规模轮动'] = MidCapRotationStrategy
 
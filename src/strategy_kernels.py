@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""策略数值内核
+逐 bar 形态判断等分支密集的标量计算，以 numba 编译；numba 缺失时退化为纯 Python。
+所有内核只接收 float64 数组与标量参数，不依赖 backtrader 对象。
+"""
+from __future__ import annotations
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba 为可选加速依赖，缺失时退化为纯 Python 实现
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+__all__ = ['tarmac_check', 'warmup_kernels']
+
+# 注: 不使用 cache=True —— numba 磁盘缓存按文件定位、却按模块名重建，本模块会以
+# src.strategy_kernels (包方式) 与 strategy_kernels (脚本方式) 两种名字导入，交替运行时
+# 读取缓存会抛 ModuleNotFoundError。编译只在每个进程首次回测时发生一次 (见 warmup_kernels)。
+# 除法均已显式判零，故用 error_model='numpy' 省去除零异常检查。
+
+
+# 未开启 fastmath: 它假定输入不含 NaN，而均量/涨幅在缺数据时可能为 NaN，开启后比较结果会偏离原实现。
+@njit(error_model='numpy')
+def tarmac_check(open_, close, pct, body_pct, volume, vol_ma5, k,
+                 surge_pct, surge_vol_ratio, body_pct_limit,
+                 confirm_max_pct, exit_drop_pct, exit_spike_pct):
+    """停机坪形态判断，k 为当前 bar 在数组中的下标。返回 (buy, sell)。
+    pct 为逐日涨幅 (%)，无前一日或前收为 0 处为 NaN；body_pct 为实体 (收-开)/开 (%)，开盘为 0 处为 0。
+    """
+    # 需要至少 4 根K线; surge day = k-3
+    if k < 3:
+        return False, False
+    s = k - 3
+    if np.isnan(pct[s]):
+        return False, False
+    vol_ma5_surge = vol_ma5[s]
+    if vol_ma5_surge == 0:
+        return False, False
+    if not (pct[s] > surge_pct and close[s] > open_[s]
+            and volume[s] / vol_ma5_surge >= surge_vol_ratio):
+        return False, False
+    # 检查接下三个确认日 (k-2, k-1, k)
+    for j in range(k - 2, k + 1):
+        if np.isnan(pct[j]):
+            return False, False
+        if not (open_[j] > close[j - 1] and close[j] > open_[j]
+                and body_pct[j] < body_pct_limit and 0.0 < pct[j] <= confirm_max_pct):
+            return False, False
+    # 卖出逻辑: 当日跌幅过大 / 异常大涨 / 收阴
+    today_pct = pct[k]
+    sell = today_pct < exit_drop_pct or today_pct > exit_spike_pct or close[k] < open_[k]
+    return True, sell
+
+
+def warmup_kernels():
+    """以小数组调用一次各内核，使 JIT 编译(或磁盘缓存加载)发生在回测开始之前。"""
+    dummy = np.ones(5, dtype=np.float64)
+    tarmac_check(dummy, dummy, dummy, dummy, dummy, dummy, 4, 9.5, 2.0, 3.0, 5.0, -3.0, 6.0)
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""测试公共设施：把项目根目录加入 sys.path (以 src 包方式导入)，并提供合成行情。"""
+from __future__ import annotations
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_frame(seed: int, n: int = 400) -> pd.DataFrame:
+    """可复现的合成日线：随机游走叠加若干放量大涨日，成交量为整数。"""
+    rng = np.random.default_rng(seed)
+    ret = rng.normal(0.0005, 0.03, n)
+    for k in rng.choice(np.arange(20, n - 5), n // 30, replace=False):
+        ret[k] = 0.10
+        ret[k + 1:k + 4] = 0.01
+    close = 10 * np.cumprod(1 + ret)
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.004, n))
+    high = np.maximum(open_, close) * 1.01
+    low = np.minimum(open_, close) * 0.99
+    vol = np.round(rng.uniform(1e6, 3e6, n))
+    vol[ret >= 0.09] *= 4
+    return pd.DataFrame({'date': pd.bdate_range('2018-01-01', periods=n), 'open': open_, 'high': high,
+                         'low': low, 'close': close, 'volume': vol, 'amount': vol * close * 100})
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""预加载 (整段数组预计算) 与流式 (逐 bar 指标) 两条路径的回测结果必须一致。"""
+from __future__ import annotations
+import backtrader as bt
+import pandas as pd
+import pytest
+
+from conftest import make_frame
+from src import backtest
+from src.strategy import STRATEGY_MAP
+
+NAMES = ['A', 'B', 'C']
+_CEREBRO = bt.Cerebro  # 未被替换的原始类，各模式都从它派生
+MODES = {'default': {}, 'nopreload': {'preload': False}, 'norunonce': {'runonce': False}}
+
+
+def _run(monkeypatch, strategy_name, mode):
+    # backtrader 内部会对 Cerebro 做 isinstance 判断，故用子类而非 functools.partial 注入运行参数
+    class ModeCerebro(_CEREBRO):
+        params = tuple(MODES[mode].items())
+
+    monkeypatch.setattr(backtest.bt, 'Cerebro', ModeCerebro)
+    dfs = [make_frame(seed) for seed in (1, 2, 3)]
+    return backtest.run_backtest(dfs, strategy_name=strategy_name, display_names=NAMES)
+
+
+@pytest.mark.parametrize('strategy_name', list(STRATEGY_MAP))
+def test_modes_give_identical_results(monkeypatch, strategy_name):
+    ref_metrics, ref_eq, ref_trades, ref_strat = _run(monkeypatch, strategy_name, 'default')
+    assert ref_strat._precomputed
+    for mode in ('nopreload', 'norunonce'):
+        metrics, eq, trades, strat = _run(monkeypatch, strategy_name, mode)
+        assert strat._precomputed == (mode != 'nopreload')
+        assert metrics == ref_metrics
+        pd.testing.assert_frame_equal(trades.reset_index(drop=True), ref_trades.reset_index(drop=True))
+        pd.testing.assert_frame_equal(eq, ref_eq)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""run_parallel：逐标的结果与单独调用 run_backtest 一致，并拒绝无法拆分的策略与重复名称。"""
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from conftest import make_frame
+from src.backtest import run_backtest, run_parallel
+from src.strategy import DEFAULT_STRATEGY_NAME, STRATEGY_MAP
+
+NAMES = ['A', 'B', 'C']
+
+
+@pytest.fixture(scope='module')
+def dfs():
+    return [make_frame(seed) for seed in (1, 2, 3)]
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_matches_per_symbol_run_backtest(dfs, n_workers):
+    strategy_name = '放量上涨'
+    summary, trades_df, per_symbol = run_parallel(dfs, strategy_name, NAMES, n_workers=n_workers)
+    expected_trades = 0
+    for df, name in zip(dfs, NAMES):
+        metrics, eq, trades, _ = run_backtest([df], strategy_name=strategy_name, display_names=[name])
+        got_metrics, got_eq = per_symbol[name]
+        assert got_metrics == metrics
+        pd.testing.assert_frame_equal(got_eq, eq)
+        pd.testing.assert_frame_equal(
+            trades_df[trades_df['symbol'] == name].reset_index(drop=True), trades.reset_index(drop=True))
+        expected_trades += metrics['交易次数']
+    assert summary['交易次数'] == expected_trades == len(trades_df)
+    assert summary['策略'] == strategy_name
+    assert summary['标的数量'] == len(dfs)
+
+
+def test_rejects_cross_sectional_strategy(dfs):
+    with pytest.raises(ValueError):
+        run_parallel(dfs, '中规模轮动', NAMES, n_workers=1)
+
+
+def test_rejects_duplicate_names(dfs):
+    with pytest.raises(ValueError):
+        run_parallel(dfs, DEFAULT_STRATEGY_NAME, ['A', 'B', 'A'], n_workers=1)
+
+
+def test_unknown_strategy_reports_resolved_name(dfs):
+    assert '不存在的策略' not in STRATEGY_MAP
+    summary, _, _ = run_parallel(dfs[:1], '不存在的策略', NAMES[:1], n_workers=1)
+    assert summary['策略'] == DEFAULT_STRATEGY_NAME
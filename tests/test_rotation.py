@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""中规模轮动策略：同一 bar 内阈值卖出且跌出目标的持仓只能清仓一次。"""
+from __future__ import annotations
+
+from conftest import make_frame
+from src.backtest import run_backtest
+
+NAMES = ['A', 'B', 'C']
+
+
+def _run():
+    dfs = [make_frame(seed) for seed in (1, 2, 3)]
+    return run_backtest(dfs, strategy_name='中规模轮动', display_names=NAMES)
+
+
+def test_no_double_sell_short_positions():
+    # 此组数据下旧实现会对同一持仓下两次 order_target_percent(0)，第二次开出空头
+    _, equity_df, _, _ = _run()
+    assert (equity_df[NAMES] >= 0).all(axis=None)
+
+
+def test_every_exit_has_an_entry():
+    # 重复清仓会多记一笔没有买入价的“幽灵”交易
+    metrics, _, trades_df, _ = _run()
+    assert len(trades_df) == metrics['交易次数']
+    assert trades_df['entry_price'].notna().all()
+    assert trades_df['entry_date'].notna().all()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""_sma 的两种窗口和后端 (np.cumsum / bottleneck) 必须与 math.fsum 参考实现逐位一致。"""
+from __future__ import annotations
+import math
+
+import numpy as np
+import pytest
+
+from src import strategy as S
+
+
+def _fsum_sma(x, period):
+    out = np.full(len(x), np.nan)
+    vals = x.tolist()
+    if len(x) >= period:
+        out[period - 1:] = [math.fsum(vals[i:i + period]) / period for i in range(len(vals) - period + 1)]
+    return out
+
+
+def _cases():
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        n = int(rng.integers(1, 1200))
+        period = int(rng.integers(1, 70))
+        x = rng.integers(0, 10 ** int(rng.integers(1, 11)), n).astype(np.float64)
+        yield x, period
+
+
+@pytest.fixture(params=['cumsum', 'bottleneck'])
+def backend(request, monkeypatch):
+    if request.param == 'bottleneck':
+        if S.bn is None:
+            pytest.skip('bottleneck 未安装')
+        monkeypatch.setattr(S, '_window_sums', S._bn_window_sums)
+    else:
+        monkeypatch.setattr(S, '_window_sums', S._cumsum_window_sums)
+    return request.param
+
+
+def test_integer_series_match_fsum(backend):
+    for x, period in _cases():
+        np.testing.assert_array_equal(S._sma(x, period), _fsum_sma(x, period))
+
+
+def test_non_integer_series_use_fsum(backend):
+    x = np.random.default_rng(3).normal(10, 1, 300)
+    x[50] = np.nan
+    np.testing.assert_array_equal(S._sma(x, 20), _fsum_sma(x, 20))
+
+
+def test_backend_selected_lazily(monkeypatch):
+    monkeypatch.setattr(S, '_window_sums', None)
+    S._sma(np.arange(30, dtype=np.float64), 5)
+    expected = S._bn_window_sums if S.bn is not None else S._cumsum_window_sums
+    assert S._window_sums is expected